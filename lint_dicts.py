@@ -0,0 +1,40 @@
+"""
+单独检查汉化词条，不需要下载游戏源码
+检查 `data/paratranz/<type>/utf8` 里导出的所有词典，报告写在 `data/lint` 里
+本地没有导出的词典时会先从 paratranz 下载
+"""
+
+import asyncio
+import time
+
+from src import (
+    logger,
+    Paratranz,
+    PARATRANZ_TOKEN,
+    SOURCE_TYPE,
+    DIR_PARATRANZ,
+    lint_paratranz,
+    dump_lint_report,
+)
+
+
+async def main():
+    start = time.time()
+    if not (DIR_PARATRANZ / SOURCE_TYPE / "utf8").exists():
+        if not PARATRANZ_TOKEN:
+            logger.error("本地没有导出的汉化词典，也未填写 PARATRANZ_TOKEN, 无法下载\n")
+            return
+        if not await Paratranz(type_=SOURCE_TYPE).download_from_paratranz():
+            return
+
+    findings = lint_paratranz(SOURCE_TYPE)
+    json_file, csv_file = dump_lint_report(findings, SOURCE_TYPE)
+    logger.info(f"\t- 检查报告: {json_file} | {csv_file}")
+
+    end = time.time()
+    return end - start
+
+
+if __name__ == "__main__":
+    last = asyncio.run(main())
+    logger.info(f"===== 总耗时 {last or -1:.2f}s =====")
@@ -1,7 +1,12 @@
 from .consts import *
 from .log import *
 
+from .client import *
 from .paratranz import *
 from .parse_text import *
 from .project_dol import *
+from .translation_memory import *
+from .lint import *
+from .source import *
+from .i18n_bundle import *
 from .download import *
@@ -1,7 +1,9 @@
+import os
 import dukpy
 from src import *
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, asdict
-from typing import Literal, Union, TypedDict, Callable, Any
+from typing import Literal, Union, TypedDict, Callable, Any, Iterable
 from typing_extensions import Self
 from types import FunctionType
 
@@ -18,6 +20,29 @@ function registerFunc(key) {
     };
 }
 """
+# 每个解释器只执行一次，之后每次解析只调用 parseArcon / checkArcon
+PARSER_SETUP = REGISTER_FUNC + """
+var acorn = require('acorn');
+function parseArcon(codeText, option, funcKeys) {
+    option = Object.assign({}, option);
+    for (var i = 0; i < funcKeys.length; i++) {
+        option[funcKeys[i]] = registerFunc(funcKeys[i]);
+    }
+    try {
+        return acorn.parse(codeText, option);
+    } catch (e) {
+        if (!(e instanceof SyntaxError)) throw e;
+        var err = Object.assign({}, e);
+        err.name = e.name;
+        err.message = e.message;
+        return err;
+    }
+}
+function checkArcon(codeText, option) {
+    var result = parseArcon(codeText, option, []);
+    return result.name === 'SyntaxError' ? result : null;
+}
+"""
 
 
 class Position(TypedDict):
@@ -158,51 +183,88 @@ class JSSyntaxError(Exception):
 
 
 class Acorn:
+    """一个常驻的 dukpy 解释器，acorn 只在创建时加载一次；dukpy 不是线程安全的，不要跨线程共用"""
     def __init__(self):
+        self.install_dep()
         self._jsi = dukpy.JSInterpreter()
         self._jsi.loader.register_path(DIR_JS_MODULE_ROOT / "acorn" / "dist")
+        self._jsi.evaljs(PARSER_SETUP)
 
     @property
     def jsi(self):
         return self._jsi
 
     def parse(self, code_text: str, option: AcornOptionParam = None):
-        self.install_dep()
+        """返回语法树，语法错误时抛出 JSSyntaxError"""
         arcon_option, func = AcornOption.parse_option(option)
-        # print(arcon_option)
-        code = [
-            REGISTER_FUNC,
-            "var acorn = require('acorn')",
-            "function parseArcon() {"
-                "var option = Object.assign({},dukpy['option']); "
-                "try {"
-        ]
         for key, value in func.items():
-            code.append(f"option['{key}'] = registerFunc('{key}')")
             self._jsi.export_function(key, value)
-        code.extend((
-                    "var result = acorn.parse(dukpy['code_text'], option);"
-                    "return result"
-                "} catch (e) {"
-                    "if (!(e instanceof SyntaxError)) throw e;"
-                    "var err = Object.assign({}, e); "
-                    "err.name = e.name;"
-                    "err.message = e.message;"
-                    "return err;"
-                "}"
-            "}",
-            "parseArcon()"))
-        result = self._jsi.evaljs(code, code_text=code_text, option=arcon_option)
+        result = self._jsi.evaljs(
+            "parseArcon(dukpy['code_text'], dukpy['option'], dukpy['func_keys'])",
+            code_text=code_text, option=arcon_option, func_keys=list(func)
+        )
         if "name" in result and result["name"] == 'SyntaxError':
             raise JSSyntaxError(**result)
         return result
 
+    def check(self, code_text: str, option: AcornOptionParam = None) -> JSSyntaxError | None:
+        """只检查语法，不把语法树传回 python"""
+        arcon_option, _ = AcornOption.parse_option(option)
+        result = self._jsi.evaljs(
+            "checkArcon(dukpy['code_text'], dukpy['option'])",
+            code_text=code_text, option=arcon_option
+        )
+        return JSSyntaxError(**result) if result else None
+
+    def parse_many(self, codes: Iterable[str], option: AcornOptionParam = None) -> list[JSSyntaxError | None]:
+        """逐个检查语法，通过的为 None"""
+        return [self.check(code_text, option) for code_text in codes]
+
     @staticmethod
     def install_dep():
         if not DIR_ARCON_ROOT.exists():
             dukpy.install_jspackage("acorn", None, DIR_ARCON_ROOT)
 
 
+_WORKER_ACORN: Acorn | None = None
+
+
+def _init_worker_acorn():
+    """进程池用，每个进程建一个常驻解释器"""
+    global _WORKER_ACORN
+    _WORKER_ACORN = Acorn()
+
+
+def _check_in_worker(code_text: str, option: AcornOptionParam = None) -> JSSyntaxError | None:
+    """进程池用"""
+    return _WORKER_ACORN.check(code_text, option)
+
+
+class AcornPool:
+    """
+    常驻的 acorn 解释器池，每个进程一个预热好的解释器
+    with AcornPool() as pool:
+        errors = pool.parse_many(codes)
+    """
+    def __init__(self, workers: int = 0):
+        """:param workers: 进程数，0 为 cpu 核数"""
+        self._workers = workers or os.cpu_count()
+        self._executor: ProcessPoolExecutor | None = None
+
+    def __enter__(self) -> Self:
+        self._executor = ProcessPoolExecutor(max_workers=self._workers, initializer=_init_worker_acorn)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._executor.shutdown()
+        self._executor = None
+
+    def parse_many(self, codes: Iterable[str], option: AcornOptionParam = None) -> list[JSSyntaxError | None]:
+        """并行检查语法，结果和 codes 一一对应，通过的为 None"""
+        codes = list(codes)
+        return list(self._executor.map(_check_in_worker, codes, [option] * len(codes)))
+
+
 __all__ = [
     "DIR_JS_MODULE_ROOT",
     "DIR_ARCON_ROOT",
@@ -210,6 +272,7 @@ __all__ = [
     "AcornOptionParam",
     "AcornOption",
     "Acorn",
+    "AcornPool",
 
     "Position",
     "TokenType",
@@ -0,0 +1,42 @@
+import contextlib
+from typing import AsyncIterator
+
+import httpx
+
+HTTP_TIMEOUT = httpx.Timeout(60, connect=15)
+HTTP_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=16, keepalive_expiry=30)
+HTTP_RETRIES = 3  # 只重试连不上的，下载中断由 download 里的续传处理
+
+# HTTP/2 是可选的: uv sync --extra http2，没装 h2 就用 HTTP/1.1
+try:
+    import h2  # noqa: F401
+except ImportError:
+    HTTP2 = False
+else:
+    HTTP2 = True
+
+
+def create_client(**kwargs) -> httpx.AsyncClient:
+    """
+    整个流程共用一个客户端，连接复用，装了 h2 就用 http2
+    async with create_client() as client:
+        dol = ProjectDOL(client=client)
+    """
+    transport = httpx.AsyncHTTPTransport(verify=False, http2=HTTP2, limits=HTTP_LIMITS, retries=HTTP_RETRIES)
+    return httpx.AsyncClient(transport=transport, timeout=HTTP_TIMEOUT, **kwargs)
+
+
+@contextlib.asynccontextmanager
+async def shared_client(client: httpx.AsyncClient | None) -> AsyncIterator[httpx.AsyncClient]:
+    """有传进来的就用传进来的，不关闭；没有就临时建一个"""
+    if client is not None:
+        yield client
+        return
+    async with create_client() as client:
+        yield client
+
+
+__all__ = [
+    "create_client",
+    "shared_client",
+]
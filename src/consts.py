@@ -21,6 +21,8 @@ PARATRANZ_HEADERS = {"Authorization": PARATRANZ_TOKEN}
 PARATRANZ_PROJECT_DOL_ID = 4780  # DOL 项目 ID
 CHINESE_VERSION = os.getenv("CHINESE_VERSION") or ""  # 必填，参考 README
 SOURCE_TYPE = os.getenv("SOURCE_TYPE") or "common"  # 必填，common 或 dev
+PROCESS_WORKERS = int(os.getenv("PROCESS_WORKERS") or 0)  # 选填，抓取文本的进程数，0 为 cpu 核数，1 为不开进程池
+I18N_BUNDLE_COMPRESSION = os.getenv("I18N_BUNDLE_COMPRESSION", "gzip")  # 选填，i18n 紧凑包的压缩格式，gzip / brotli / 留空不压缩
 
 """Modloader"""
 REPOSITORY_MODLOADER_ARTIFACTS = "https://api.github.com/repos/Lyoko-Jeremie/DoLModLoaderBuild/actions/artifacts"
@@ -39,6 +41,7 @@ DIR_DATA_ROOT = DIR_ROOT / "data"
 DIR_JSON_ROOT = DIR_DATA_ROOT / "json"
 DIR_TEMP_ROOT = DIR_DATA_ROOT / "temp"
 DIR_MODS_ROOT = DIR_DATA_ROOT / "mods"
+DIR_CACHE_ROOT = DIR_DATA_ROOT / "cache"  # 跨版本保留的缓存，删库跑路时不删
 
 DIR_GAME_ROOT_COMMON_NAME = "degrees-of-lewdity-master"
 DIR_GAME_ROOT_COMMON = DIR_ROOT / DIR_GAME_ROOT_COMMON_NAME
@@ -55,6 +58,7 @@ DIR_GAME_ANDROID_ROOT_DEV = DIR_GAME_ROOT_DEV / "devTools" / "androidsdk" / "ima
 DIR_RAW_DICTS = DIR_DATA_ROOT / "raw_dicts"
 
 DIR_PARATRANZ = DIR_DATA_ROOT / "paratranz"
+DIR_LINT_ROOT = DIR_DATA_ROOT / "lint"  # 汉化词条检查报告
 
 """文件"""
 FILE_REPOSITORY_ZIP = DIR_TEMP_ROOT / "dol.zip"
@@ -277,6 +281,8 @@ __all__ = [
 	"PARATRANZ_PROJECT_DOL_ID",
 	"CHINESE_VERSION",
 	"SOURCE_TYPE",
+	"PROCESS_WORKERS",
+	"I18N_BUNDLE_COMPRESSION",
 	"REPOSITORY_URL_COMMON",
 	"REPOSITORY_ZIP_URL_COMMON",
 	"REPOSITORY_COMMITS_URL_COMMON",
@@ -287,6 +293,7 @@ __all__ = [
 	"DIR_JSON_ROOT",
 	"DIR_TEMP_ROOT",
 	"DIR_MODS_ROOT",
+	"DIR_CACHE_ROOT",
 	"DIR_GAME_ROOT_COMMON_NAME",
 	"DIR_GAME_ROOT_COMMON",
 	"DIR_GAME_TEXTS_COMMON",
@@ -299,6 +306,7 @@ __all__ = [
 	"DIR_GAME_ANDROID_ROOT_DEV",
 	"DIR_RAW_DICTS",
 	"DIR_PARATRANZ",
+	"DIR_LINT_ROOT",
 	"FILE_REPOSITORY_ZIP",
 	"FILE_PARATRANZ_ZIP",
 	"FILE_COMMITS",
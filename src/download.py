@@ -1,45 +1,324 @@
-# FIXME 神经 GitGud，不知道在搞什么
-# from pathlib import Path
-# from aiofiles import open as aopen
-# import httpx
-#
-# from .log import logger
-#
-#
-# async def chunk_split(filesize: int, chunk: int = 2) -> list[list[int]]:
-#     """给大文件切片"""
-#     step = filesize // chunk
-#     arr = range(0, filesize, step)
-#     result = [[arr[i], arr[i + 1] - 1] for i in range(len(arr) - 1)]
-#     result[-1][-1] = filesize - 1
-#     # logger.info(f"chunks: {result}")
-#     return result
-#
-#
-# async def chunk_download(
-#     url: str,
-#     client: httpx.AsyncClient,
-#     start: int,
-#     end: int,
-#     idx: int,
-#     full: int,
-#     save_path: Path,
-#     headers_: dict = None,
-# ):
-#     """切片下载"""
-#     if not save_path.exists():
-#         with open(save_path, "wb") as _:
-#             ...
-#     headers = (
-#         {"Range": f"bytes={start}-{end}"} | headers_
-#         if headers_
-#         else {"Range": f"bytes={start}-{end}"}
-#     )
-#     response = await client.get(url, headers=headers, follow_redirects=True, timeout=60)
-#     async with aopen(save_path, "rb+") as fp:
-#         await fp.seek(start)
-#         await fp.write(response.content)
-#         logger.info(f"\t- 切片 {idx + 1} / {full} 已下载")
-#
-#
-# __all__ = ["chunk_split", "chunk_download"]
+import asyncio
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import httpx
+from aiofiles import open as aopen
+
+from .log import logger
+
+
+def part_path(save_path: Path) -> Path:
+    """没下完的文件放在 xxx.part 里，下完校验通过才改名"""
+    return save_path.with_name(f"{save_path.name}.part")
+
+
+def validator_path(save_path: Path) -> Path:
+    """xxx.part 对应的 ETag / Last-Modified，续传时用来确认服务器上的文件没变"""
+    return save_path.with_name(f"{save_path.name}.part.json")
+
+
+def _load_validator(save_path: Path) -> dict[str, str]:
+    if not (file := validator_path(save_path)).exists():
+        return {}
+    try:
+        with open(file, "r", encoding="utf-8") as fp:
+            return json.load(fp)
+    except (OSError, ValueError):
+        return {}
+
+
+def _response_validator(response: httpx.Response) -> dict[str, str]:
+    """响应头里的 ETag / Last-Modified"""
+    return {
+        key: value
+        for key, value in (
+            ("etag", response.headers.get("ETag")),
+            ("last_modified", response.headers.get("Last-Modified")),
+        )
+        if value
+    }
+
+
+def _dump_validator(save_path: Path, response: httpx.Response) -> dict[str, str]:
+    """记下这次响应的校验信息，没有就删掉旧的，下次不续传"""
+    validator = _response_validator(response)
+    file = validator_path(save_path)
+    if validator:
+        with open(file, "w", encoding="utf-8") as fp:
+            json.dump(validator, fp)
+    else:
+        file.unlink(missing_ok=True)
+    return validator
+
+
+def _if_range(validator: dict[str, str]) -> str | None:
+    """If-Range 只认强 ETag 或者 Last-Modified"""
+    if (etag := validator.get("etag")) and not etag.startswith("W/"):
+        return etag
+    return validator.get("last_modified")
+
+
+def _discard_part(save_path: Path):
+    part_path(save_path).unlink(missing_ok=True)
+    validator_path(save_path).unlink(missing_ok=True)
+
+
+def _backoff(attempt: int, base: float) -> float:
+    """第 n 次重试前等 base * 2^n 秒，最多 30 秒"""
+    return min(base * 2 ** attempt, 30)
+
+
+def file_digest(filepath: Path, algorithm: str = "md5", chunk_size: int = 1 << 20) -> str:
+    """分块算哈希，不把整个文件读进内存"""
+    hasher = hashlib.new(algorithm)
+    with open(filepath, "rb") as fp:
+        while chunk := fp.read(chunk_size):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def _total_size(response: httpx.Response, offset: int) -> int | None:
+    """从 Content-Range / Content-Length 算出完整文件大小"""
+    content_range = response.headers.get("Content-Range", "")
+    if "/" in content_range and (total := content_range.rsplit("/", 1)[1]).isdigit():
+        return int(total)
+    if (length := response.headers.get("Content-Length", "")).isdigit():
+        return int(length) + (offset if response.status_code == 206 else 0)
+    return None
+
+
+async def stream_download(
+    url: str,
+    save_path: Path,
+    client: httpx.AsyncClient,
+    size: int = None,
+    digest: str = None,
+    algorithm: str = "md5",
+    retries: int = 3,
+    chunk_size: int = 1 << 16,
+    timeout: float = 60,
+    headers: dict = None,
+    backoff: float = 1,
+) -> bool:
+    """
+    流式下载，边下边写进 xxx.part，断了用 Range 从断点续传
+    续传时带上 If-Range (xxx.part.json 里记的 ETag / Last-Modified)，服务器上的文件变了就从头下
+    没记校验信息的 xxx.part 不敢续，删了重下
+    :param size: 期望的文件大小，不传则用响应头里的
+    :param digest: 期望的哈希，不传则不校验
+    :param backoff: 重试前等待 backoff * 2^n 秒
+    :return: 下载并校验通过后改名为 save_path 返回 True
+    """
+    os.makedirs(save_path.parent, exist_ok=True)
+    part_file = part_path(save_path)
+    validator = _load_validator(save_path)
+    if part_file.exists() and not _if_range(validator):
+        logger.warning(f"\t- 没有记录校验信息，不续传上次没下完的文件: {part_file}")
+        _discard_part(save_path)
+        validator = {}
+
+    for attempt in range(retries + 1):
+        if attempt:
+            await asyncio.sleep(_backoff(attempt - 1, backoff))
+        offset = part_file.stat().st_size if part_file.exists() else 0
+        if offset and not _if_range(validator):  # 第一次响应就没给 ETag / Last-Modified，断了没法确认，从头下
+            _discard_part(save_path)
+            offset = 0
+        if size is not None and offset >= size:
+            break
+
+        request_headers = dict(headers or {})
+        if offset:
+            request_headers["Range"] = f"bytes={offset}-"
+            request_headers["If-Range"] = _if_range(validator)  # 文件变了就让服务器直接给完整的
+        try:
+            async with client.stream("GET", url, headers=request_headers, timeout=timeout, follow_redirects=True) as response:
+                if response.status_code == 416 and offset:  # 已经下完了
+                    break
+                response.raise_for_status()
+                if response.status_code == 206 and validator.get("etag") and response.headers.get("ETag") not in {None, validator["etag"]}:
+                    raise httpx.HTTPStatusError("ETag changed while resuming", request=response.request, response=response)
+                if response.status_code != 206:  # 不支持续传或者文件变了，从头下
+                    offset = 0
+                    validator = _dump_validator(save_path, response)
+                if size is None:
+                    size = _total_size(response, offset)
+
+                async with aopen(part_file, "ab" if offset else "wb") as fp:
+                    async for chunk in response.aiter_bytes(chunk_size):
+                        await fp.write(chunk)
+        except (httpx.TransportError, httpx.HTTPStatusError) as e:
+            logger.warning(f"\t- 下载中断 ({attempt + 1} / {retries + 1}): {e!r}")
+            if isinstance(e, httpx.HTTPStatusError) and e.response.status_code == 206:  # 对不上了，下次从头下
+                _discard_part(save_path)
+                validator = {}
+            continue
+        else:
+            if size is None or part_file.stat().st_size >= size:
+                break
+
+    if not part_file.exists():
+        return False
+    downloaded = part_file.stat().st_size
+    if size is not None and downloaded != size:
+        logger.error(f"\t!!! 文件大小不对：{downloaded} / {size} | {save_path}")
+        if downloaded > size:  # 续不上了，下次从头下
+            _discard_part(save_path)
+        return False
+    if digest and (actual := file_digest(part_file, algorithm)) != digest.lower():
+        logger.error(f"\t!!! 文件哈希不对：{actual} / {digest} | {save_path}")
+        _discard_part(save_path)
+        return False
+    part_file.replace(save_path)
+    validator_path(save_path).unlink(missing_ok=True)
+    return True
+
+
+def chunk_split(filesize: int, chunk_size: int) -> list[tuple[int, int]]:
+    """给大文件切片，闭区间 [start, end]"""
+    return [
+        (start, min(start + chunk_size, filesize) - 1)
+        for start in range(0, filesize, chunk_size)
+    ]
+
+
+class _FileChanged(Exception):
+    """切片下到一半服务器上的文件变了，要从头下"""
+
+
+async def _probe_ranges(client: httpx.AsyncClient, url: str, headers: dict, timeout: float) -> tuple[int | None, dict[str, str]]:
+    """只要第一个字节，服务器支持 Range 就返回文件大小和 ETag / Last-Modified，不支持文件大小为 None"""
+    async with client.stream("GET", url, headers=headers | {"Range": "bytes=0-0"}, timeout=timeout, follow_redirects=True) as response:
+        response.raise_for_status()
+        if response.status_code != 206:
+            return None, {}
+        return _total_size(response, 0), _response_validator(response)
+
+
+async def _download_chunk(
+    client: httpx.AsyncClient,
+    url: str,
+    part_file: Path,
+    start: int,
+    end: int,
+    semaphore: asyncio.Semaphore,
+    retries: int,
+    timeout: float,
+    headers: dict,
+    chunk_size: int,
+    backoff: float,
+    validator: dict[str, str],
+) -> bool:
+    """
+    下载一个切片写到文件对应位置，失败了只重下这一片
+    带上探测时的 If-Range，服务器上的文件变了会给 200，抛 _FileChanged 让整个文件从头下
+    """
+    request_headers = headers | {"Range": f"bytes={start}-{end}", "If-Range": _if_range(validator)}
+    async with semaphore:
+        for attempt in range(retries + 1):
+            if attempt:
+                await asyncio.sleep(_backoff(attempt - 1, backoff))
+            written = 0
+            try:
+                async with client.stream("GET", url, headers=request_headers, timeout=timeout, follow_redirects=True) as response:
+                    response.raise_for_status()
+                    if response.status_code != 206 or (validator.get("etag") and response.headers.get("ETag") not in {None, validator["etag"]}):
+                        raise _FileChanged(f"切片 {start}-{end}: {response.status_code} {response.headers.get('ETag')}")
+                    async with aopen(part_file, "r+b") as fp:
+                        await fp.seek(start)
+                        async for chunk in response.aiter_bytes(chunk_size):
+                            if (remaining := end - start + 1 - written) <= 0:
+                                break
+                            await fp.write(chunk[:remaining])
+                            written += len(chunk)
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                logger.warning(f"\t- 切片 {start}-{end} 下载中断 ({attempt + 1} / {retries + 1}): {e!r}")
+                continue
+            if written >= end - start + 1:
+                return True
+    return False
+
+
+async def chunk_download(
+    url: str,
+    save_path: Path,
+    client: httpx.AsyncClient,
+    digest: str = None,
+    algorithm: str = "md5",
+    piece_size: int = 4 << 20,
+    concurrency: int = 8,
+    retries: int = 3,
+    chunk_size: int = 1 << 16,
+    timeout: float = 60,
+    headers: dict = None,
+    backoff: float = 1,
+) -> bool:
+    """
+    切片并发下载，先按文件大小占好位置再各自写进去
+    服务器不支持 Range 或者文件不大时退回 stream_download
+    每片都带上探测时的 ETag / Last-Modified，下到一半文件变了就从头下，最多 retries 次
+    :param piece_size: 每片大小
+    :param concurrency: 同时下载的切片数
+    :return: 下载并校验通过后改名为 save_path 返回 True
+    """
+    headers = dict(headers or {})
+    os.makedirs(save_path.parent, exist_ok=True)
+    # 占好位置的文件大小一开始就是全的，不能和 stream_download 续传的 .part 混用
+    part_file = save_path.with_name(f"{save_path.name}.chunks")
+    for attempt in range(retries + 1):
+        try:
+            filesize, validator = await _probe_ranges(client, url, headers, timeout)
+        except (httpx.TransportError, httpx.HTTPStatusError) as e:
+            logger.warning(f"\t- 无法获取文件大小，改为单线程下载: {e!r}")
+            filesize, validator = None, {}
+        if filesize and filesize > piece_size and not _if_range(validator):
+            logger.warning("\t- 没有 ETag / Last-Modified，切片时确认不了文件没变，改为单线程下载")
+            filesize = None
+        if not filesize or filesize <= piece_size:
+            return await stream_download(url, save_path, client, size=filesize, digest=digest, algorithm=algorithm, retries=retries, chunk_size=chunk_size, timeout=timeout, headers=headers, backoff=backoff)
+
+        with open(part_file, "wb") as fp:
+            fp.truncate(filesize)
+        semaphore = asyncio.Semaphore(concurrency)
+        chunks = chunk_split(filesize, piece_size)
+        tasks = [
+            asyncio.create_task(_download_chunk(client, url, part_file, start, end, semaphore, retries, timeout, headers, chunk_size, backoff, validator))
+            for start, end in chunks
+        ]
+        try:
+            results = await asyncio.gather(*tasks)
+        except _FileChanged as e:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            part_file.unlink()
+            logger.warning(f"\t- 下载途中文件变了，从头下 ({attempt + 1} / {retries + 1}): {e}")
+            continue
+        break
+    else:
+        logger.error(f"\t!!! 文件一直在变，下载失败 | {save_path}")
+        return False
+
+    if not all(results):
+        logger.error(f"\t!!! {results.count(False)} / {len(chunks)} 个切片下载失败 | {save_path}")
+        part_file.unlink()
+        return False
+    if digest and (actual := file_digest(part_file, algorithm)) != digest.lower():
+        logger.error(f"\t!!! 文件哈希不对：{actual} / {digest} | {save_path}")
+        part_file.unlink()
+        return False
+    part_file.replace(save_path)
+    return True
+
+
+__all__ = [
+    "part_path",
+    "validator_path",
+    "file_digest",
+    "stream_download",
+    "chunk_split",
+    "chunk_download",
+]
@@ -0,0 +1,167 @@
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import TextIO
+
+from .log import logger
+
+try:
+	import brotli
+except ImportError:
+	brotli = None
+
+BUNDLE_FORMAT_VERSION = 1
+CHUNK_SIZE = 1 << 16
+
+TYPE_B_COLUMNS = {
+	"TypeBOutputText": ("f", "t", "pos", "fileName", "flag"),
+	"TypeBInputStoryScript": ("f", "t", "pos", "fileName", "flag", "pN"),
+}
+FLAGS = {"js": 1, "css": 2}  # flag 列：0 普通，1 js，2 css
+
+
+class I18nBundleWriter:
+	"""
+	i18n.json 的紧凑版，和 i18n.json 一起生成
+	1. 按列存，不再每条都重复 f / t / pos / fileName / pN 这些键
+	2. 文件名和 passage 名去重，列里只存下标
+	3. 可选 gzip / brotli 压缩，另附一个 manifest 记录大小、哈希和条数
+	每列先写进临时文件，内存里只放去重后的文件名和 passage 名
+	"""
+	def __init__(self, bundle_dir: Path, name: str = "i18n", compression: str | None = "gzip"):
+		if compression not in {None, "", "gzip", "brotli"}:
+			raise ValueError(f"不支持的压缩格式: {compression}")
+		if compression == "brotli" and brotli is None:
+			raise ImportError("I18N_BUNDLE_COMPRESSION=brotli 需要安装可选依赖 brotli: uv sync --extra brotli")
+
+		self._bundle_dir = bundle_dir
+		self._name = name
+		self._compression = compression or None
+
+		self._file_names: dict[str, int] = {}
+		self._passage_names: dict[str, int] = {}
+		self._counts: dict[str, int] = {type_b: 0 for type_b in TYPE_B_COLUMNS}
+
+		self._temp_dir: tempfile.TemporaryDirectory | None = None
+		self._columns: dict[tuple[str, str], TextIO] = {}
+
+	def __enter__(self):
+		self._temp_dir = tempfile.TemporaryDirectory()
+		for type_b, columns in TYPE_B_COLUMNS.items():
+			for column in columns:
+				self._columns[type_b, column] = open(Path(self._temp_dir.name) / f"{type_b}.{column}", "w+", encoding="utf-8")
+		return self
+
+	def __exit__(self, exc_type, exc_val, exc_tb):
+		try:
+			if exc_type is None:
+				self._dump()
+		finally:
+			for fp in self._columns.values():
+				fp.close()
+			self._temp_dir.cleanup()
+
+	@property
+	def bundle_file(self) -> Path:
+		suffix = {None: "", "gzip": ".gz", "brotli": ".br"}[self._compression]
+		return self._bundle_dir / f"{self._name}.bundle.json{suffix}"
+
+	@property
+	def manifest_file(self) -> Path:
+		return self._bundle_dir / f"{self._name}.manifest.json"
+
+	def add(self, type_b: str, result_data: dict):
+		"""result_data 即 i18n.json 中的一条"""
+		flag = next((value for key, value in FLAGS.items() if result_data.get(key)), 0)
+		values = {
+			"f": result_data["f"],
+			"t": result_data["t"],
+			"pos": result_data["pos"],
+			"fileName": self._intern(self._file_names, result_data["fileName"]),
+			"flag": flag,
+		}
+		if "pN" in TYPE_B_COLUMNS[type_b]:
+			values["pN"] = self._intern(self._passage_names, result_data["pN"])
+
+		separator = "," if self._counts[type_b] else ""
+		for column in TYPE_B_COLUMNS[type_b]:
+			self._columns[type_b, column].write(separator + json.dumps(values[column], ensure_ascii=False, separators=(",", ":")))
+		self._counts[type_b] += 1
+
+	@staticmethod
+	def _intern(table: dict[str, int], value: str) -> int:
+		if value not in table:
+			table[value] = len(table)
+		return table[value]
+
+	def _iter_raw_chunks(self):
+		"""拼出完整的列式 json"""
+		dumps = lambda obj: json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+		yield f'{{"version":{BUNDLE_FORMAT_VERSION},"fileNames":{dumps(list(self._file_names))},"passageNames":{dumps(list(self._passage_names))},"typeB":{{'
+		for idx_type, (type_b, columns) in enumerate(TYPE_B_COLUMNS.items()):
+			yield f'{"," if idx_type else ""}"{type_b}":{{'
+			for idx_column, column in enumerate(columns):
+				yield f'{"," if idx_column else ""}"{column}":['
+				fp = self._columns[type_b, column]
+				fp.seek(0)
+				while chunk := fp.read(CHUNK_SIZE):
+					yield chunk
+				yield "]"
+			yield "}"
+		yield "}}"
+
+	def _dump(self):
+		os.makedirs(self._bundle_dir, exist_ok=True)
+		raw_size = 0
+		if self._compression == "gzip":
+			# mtime 固定为 0，同样的内容压出来的文件也一样
+			with open(self.bundle_file, "wb") as raw_fp, gzip.GzipFile(fileobj=raw_fp, mode="wb", compresslevel=9, mtime=0) as fp:
+				for chunk in self._iter_raw_chunks():
+					data = chunk.encode("utf-8")
+					raw_size += len(data)
+					fp.write(data)
+		elif self._compression == "brotli":
+			compressor = brotli.Compressor()
+			with open(self.bundle_file, "wb") as fp:
+				for chunk in self._iter_raw_chunks():
+					data = chunk.encode("utf-8")
+					raw_size += len(data)
+					fp.write(compressor.process(data))
+				fp.write(compressor.finish())
+		else:
+			with open(self.bundle_file, "wb") as fp:
+				for chunk in self._iter_raw_chunks():
+					data = chunk.encode("utf-8")
+					raw_size += len(data)
+					fp.write(data)
+
+		sha256 = hashlib.sha256()
+		with open(self.bundle_file, "rb") as fp:
+			while chunk := fp.read(CHUNK_SIZE):
+				sha256.update(chunk)
+
+		manifest = {
+			"version": BUNDLE_FORMAT_VERSION,
+			"bundle": self.bundle_file.name,
+			"compression": self._compression,
+			"size": self.bundle_file.stat().st_size,
+			"rawSize": raw_size,
+			"sha256": sha256.hexdigest(),
+			"counts": self._counts,
+			"fileNames": len(self._file_names),
+			"passageNames": len(self._passage_names),
+			"columns": {type_b: list(columns) for type_b, columns in TYPE_B_COLUMNS.items()},
+			"flags": FLAGS,
+		}
+		with open(self.manifest_file, "w", encoding="utf-8") as fp:
+			json.dump(manifest, fp, ensure_ascii=False, indent=2)
+		logger.info(f"\t- i18n 压缩包已生成: {self.bundle_file.name} ({manifest['size']} / {raw_size} 字节)")
+
+
+__all__ = [
+	"BUNDLE_FORMAT_VERSION",
+	"I18nBundleWriter",
+]
@@ -0,0 +1,303 @@
+import csv
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import Path
+from typing import Iterable
+from urllib.parse import quote
+
+from .consts import *
+from .log import logger
+
+
+class LintRule(Enum):
+	"""词条检查规则: 提示"""
+	LACK_ANGLE = "可能的尖括号数量错误"
+	LACK_SQUARE = "可能的方括号数量错误"
+	DIFFERENT_EVENT = "可能的事件名称错翻"
+	FULL_NOTATION_NEW = "可能的半全角错误"
+	LACK_YIN = "可能缺少引号"
+	FULL_COMMA = "可能的全角逗号"
+	FULL_NOTATION = "可能的单双引号错误"
+	LOST_NOTATION = "可能漏了引号逗号"
+
+
+# 单个尖括号/方括号，前后不能挨着同样的括号，和之前 re.findall 的规则一致
+PATTERN_LEFT_ANGLE_SINGLE = re.compile(r"[^<=]<[^<=3]")
+PATTERN_RIGHT_ANGLE_SINGLE = re.compile(r"[^>=]>[^>=:]")
+PATTERN_LEFT_SQUARE_SINGLE = re.compile(r"[^\[]\[[^\[]")
+PATTERN_RIGHT_SQUARE_SINGLE = re.compile(r"[^]]][^]]")
+PATTERN_LINK_EVENT = re.compile(r"<<link\s\[\[.*?\|(.*?)\]\]")
+PATTERN_ALNUM = re.compile(r"[A-Za-z\d]")
+
+
+@dataclass(frozen=True, slots=True)
+class TextProfile:
+	"""一条文本的括号/引号/链接目标统计，一次算完，检查规则只比对数字"""
+	has_angle: bool = False
+	has_double_angle: bool = False
+	only_marks: bool = False
+	left_angle_single: int = 0
+	right_angle_single: int = 0
+	left_angle_double: int = 0
+	right_angle_double: int = 0
+
+	has_square: bool = False
+	has_double_square: bool = False
+	left_square_single: int = 0
+	right_square_single: int = 0
+	left_square_double: int = 0
+	right_square_double: int = 0
+
+	link_events: tuple[str, ...] = ()
+	quotes: int = 0
+	quote_commas: int = 0
+
+	@classmethod
+	def of(cls, text: str) -> "TextProfile":
+		if not text:
+			return cls(only_marks=True)
+
+		has_angle = "<" in text or ">" in text
+		has_square = "[" in text or "]" in text
+		angle_counts = square_counts = (0, 0, 0, 0)
+		if has_angle:
+			# 首尾不好判断，补一个字符
+			padded = f"{'_' if text[0] == '<' else ''}{text}{'_' if text[-1] == '>' else ''}"
+			angle_counts = (
+				len(PATTERN_LEFT_ANGLE_SINGLE.findall(padded)),
+				len(PATTERN_RIGHT_ANGLE_SINGLE.findall(padded)),
+				text.count("<<"),
+				text.count(">>"),
+			)
+		if has_square:
+			padded = f"{'_' if text[0] == '[' else ''}{text}{'_' if text[-1] == ']' else ''}"
+			square_counts = (
+				len(PATTERN_LEFT_SQUARE_SINGLE.findall(padded)),
+				len(PATTERN_RIGHT_SQUARE_SINGLE.findall(padded)),
+				text.count("[["),
+				text.count("]]"),
+			)
+		return cls(
+			has_angle,
+			"<<" in text or ">>" in text,
+			PATTERN_ALNUM.search(text) is None,
+			*angle_counts,
+			has_square,
+			"[[" in text or "]]" in text,
+			*square_counts,
+			tuple(PATTERN_LINK_EVENT.findall(text)) if "<<link [[" in text else (),
+			text.count('"'),
+			text.count('",'),
+		)
+
+
+@dataclass(slots=True)
+class LintResult:
+	"""一条词条的检查结果"""
+	en: str
+	zh: str
+	issues: list[LintRule] = field(default_factory=list)
+
+	def __bool__(self) -> bool:
+		"""有问题为 True"""
+		return bool(self.issues)
+
+
+class LintEngine:
+	"""
+	词条检查，原文的统计按原文缓存，同样的原文只算一次
+	engine = LintEngine()
+	for issue in engine.lint(zh, en).issues: ...
+	"""
+	def __init__(self):
+		self._en_profiles: dict[str, TextProfile] = {}
+
+	def profile_en(self, en: str) -> TextProfile:
+		if (profile := self._en_profiles.get(en)) is None:
+			profile = self._en_profiles[en] = TextProfile.of(en)
+		return profile
+
+	def lint(self, zh: str, en: str, rules: Iterable[LintRule] = LintRule) -> LintResult:
+		"""逐条规则检查，返回所有命中的规则"""
+		result = LintResult(en, zh)
+		if not zh:
+			return result
+		en_profile = self.profile_en(en)
+		zh_profile = TextProfile.of(zh)
+		for rule in rules:
+			if self.RULES[rule](zh, en, zh_profile, en_profile):
+				result.issues.append(rule)
+		return result
+
+	@staticmethod
+	def _is_lack_angle(zh: str, en: str, zh_profile: TextProfile, en_profile: TextProfile) -> bool:
+		"""<<> 缺一个 >"""
+		if not en_profile.has_angle or en_profile.only_marks:
+			return False
+		if not en_profile.has_double_angle:
+			if zh_profile.left_angle_single == zh_profile.right_angle_single:
+				return False
+			return (
+				en_profile.left_angle_single != zh_profile.left_angle_single
+				or en_profile.right_angle_single != zh_profile.right_angle_single
+			)  # 形如 < > <, 也只有这一种情况
+
+		if zh_profile.left_angle_double == zh_profile.right_angle_double:
+			return False
+		return (
+			en_profile.left_angle_double != zh_profile.left_angle_double
+			or en_profile.right_angle_double != zh_profile.right_angle_double
+		)  # 形如 << >> <<
+
+	@staticmethod
+	def _is_lack_square(zh: str, en: str, zh_profile: TextProfile, en_profile: TextProfile) -> bool:
+		"""缺一个 [ 或 ]"""
+		if not en_profile.has_square:
+			return False
+		if not en_profile.has_double_square:
+			if zh_profile.left_square_single == zh_profile.right_square_single:
+				return False
+			return (
+				en_profile.left_square_single != zh_profile.left_square_single
+				or en_profile.right_square_single != zh_profile.right_square_single
+			)  # 形如 [ ] [, 也只有这一种情况
+
+		if zh_profile.left_square_double == zh_profile.right_square_double:
+			return False
+		return (
+			en_profile.left_square_double != zh_profile.left_square_double
+			or en_profile.right_square_double != zh_profile.right_square_double
+		)  # 形如 [[ ]] [[
+
+	@staticmethod
+	def _is_different_event(zh: str, en: str, zh_profile: TextProfile, en_profile: TextProfile) -> bool:
+		"""<<link [[TEXT|EVENT]]>> 中 EVENT 打错了"""
+		if not en_profile.link_events:
+			return False
+		# 译文里没有 "<<link [[" 也要比，所以不能用 zh_profile.link_events
+		return en_profile.link_events != tuple(PATTERN_LINK_EVENT.findall(zh))
+
+	@staticmethod
+	def _is_full_notation_new(zh: str, en: str, zh_profile: TextProfile, en_profile: TextProfile) -> bool:
+		"""半全角打错了"""
+		if "cn_name" in zh or "writ_cn" in zh:
+			return False
+		return en_profile.quote_commas != zh_profile.quote_commas
+
+	@staticmethod
+	def _is_lack_yin(zh: str, en: str, zh_profile: TextProfile, en_profile: TextProfile) -> bool:
+		"""缺少引号"""
+		return (en_profile.quotes - zh_profile.quotes) % 2 != 0
+
+	@staticmethod
+	def _is_full_comma(zh: str, en: str, zh_profile: TextProfile, en_profile: TextProfile) -> bool:
+		"""全角逗号"""
+		return zh.endswith('"，')
+
+	@staticmethod
+	def _is_full_notation(zh: str, en: str, zh_profile: TextProfile, en_profile: TextProfile) -> bool:
+		"""单双引号打错了"""
+		if '",' in en and '”,' in zh:
+			return True
+		return ': "' in en and ': “' in zh
+
+	@staticmethod
+	def _is_lost_notation(zh: str, en: str, zh_profile: TextProfile, en_profile: TextProfile) -> bool:
+		"""漏了引号逗号"""
+		return en.endswith(("',", '",', "`,")) and zh[-2:] != en[-2:]
+
+	RULES = {
+		LintRule.LACK_ANGLE: _is_lack_angle,
+		LintRule.LACK_SQUARE: _is_lack_square,
+		LintRule.DIFFERENT_EVENT: _is_different_event,
+		LintRule.FULL_NOTATION_NEW: _is_full_notation_new,
+		LintRule.LACK_YIN: _is_lack_yin,
+		LintRule.FULL_COMMA: _is_full_comma,
+		LintRule.FULL_NOTATION: _is_full_notation,
+		LintRule.LOST_NOTATION: _is_lost_notation,
+	}
+
+
+_WORKER_ENGINE = LintEngine()  # 每个进程一个，原文统计在进程内缓存
+REPORT_FIELDS = ("file", "key", "rule", "message", "en", "zh", "url")
+
+
+def _lint_file(file: Path, root: Path, rules: tuple[LintRule, ...]) -> list[dict[str, str]]:
+	"""进程池用，检查一个导出的 csv"""
+	findings = []
+	with open(file, "r", encoding="utf-8") as fp:
+		for row in csv.reader(fp):
+			if len(row) < 3:  # 没汉化
+				continue
+			key = row[0]
+			en, zh = row[-2:]
+			en, zh = en.strip(), zh.strip()
+			if not zh:
+				continue
+			# 和覆写时一样先处理首尾的中文引号
+			zh = re.sub('^(“)', '"', zh)
+			zh = re.sub('(”)$', '"', zh)
+			for issue in _WORKER_ENGINE.lint(zh, en, rules).issues:
+				findings.append({
+					"file": file.relative_to(root).as_posix(),
+					"key": key,
+					"rule": issue.name,
+					"message": issue.value,
+					"en": en,
+					"zh": zh,
+					"url": f"https://paratranz.cn/projects/{PARATRANZ_PROJECT_DOL_ID}/strings?text={quote(en)}",
+				})
+	return findings
+
+
+def lint_paratranz(type_: str = "common", workers: int = PROCESS_WORKERS, rules: Iterable[LintRule] = LintRule) -> list[dict[str, str]]:
+	"""
+	检查 paratranz 导出的所有汉化词条，不需要游戏源码
+	:param workers: 进程池大小，0 为 cpu 核数，1 为不开进程池
+	"""
+	root = DIR_PARATRANZ / type_ / "utf8"
+	rules = tuple(rules)
+	files: list[Path] = []
+	for dirpath, dir_list, file_list in os.walk(root):
+		dir_list.sort()
+		if "失效词条" in dirpath or "移除文件" in dirpath:
+			continue
+		files.extend(Path(dirpath) / file for file in sorted(file_list) if file.endswith(".csv"))
+	logger.info(f"===== 开始检查 {len(files)} 个汉化词典 ...")
+
+	if workers == 1 or len(files) <= 1:
+		results = [_lint_file(file, root, rules) for file in files]
+	else:
+		with ProcessPoolExecutor(max_workers=workers or None) as executor:
+			results = list(executor.map(_lint_file, files, [root] * len(files), [rules] * len(files), chunksize=8))
+	findings = [finding for result in results for finding in result]
+	logger.info(f"##### 汉化词典检查完毕，共 {len(findings)} 处可能的问题 !\n")
+	return findings
+
+
+def dump_lint_report(findings: list[dict[str, str]], type_: str = "common") -> tuple[Path, Path]:
+	"""写出 json 和 csv 两份报告"""
+	os.makedirs(DIR_LINT_ROOT, exist_ok=True)
+	json_file = DIR_LINT_ROOT / f"lint_{type_}.json"
+	csv_file = DIR_LINT_ROOT / f"lint_{type_}.csv"
+	with open(json_file, "w", encoding="utf-8") as fp:
+		json.dump(findings, fp, ensure_ascii=False, indent=2)
+	with open(csv_file, "w", encoding="utf-8-sig", newline="") as fp:
+		writer = csv.DictWriter(fp, fieldnames=REPORT_FIELDS)
+		writer.writeheader()
+		writer.writerows(findings)
+	return json_file, csv_file
+
+
+__all__ = [
+	"LintRule",
+	"TextProfile",
+	"LintResult",
+	"LintEngine",
+	"lint_paratranz",
+	"dump_lint_report",
+]
@@ -1,16 +1,31 @@
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from zipfile import ZipFile, BadZipfile
 
+import asyncio
 import os
-import contextlib
 import httpx
 
+from .client import shared_client
 from .consts import *
+from .download import chunk_download
 from .log import logger
 
 
 class Paratranz:
     """下载汉化包相关"""
-    def __init__(self, type_: str = "common"):
+    # 等导出时的轮询间隔：2s 起每次翻倍，最多 60s 一次，总共等 10 分钟
+    POLL_INITIAL_DELAY: float = 2
+    POLL_MAX_DELAY: float = 60
+    POLL_TIMEOUT: float = 600
+
+    def __init__(self, type_: str = "common", client: httpx.AsyncClient = None, base_url: str = PARATRANZ_BASE_URL):
+        """
+        :param client: 整个流程共用的客户端，不传则每次请求临时建一个
+        :param base_url: paratranz api 地址，测试时换成本地的
+        """
+        self._client = client
+        self._base_url = base_url
         self._type = type_
         self._project_id = PARATRANZ_PROJECT_DOL_ID
         self._mention_name = "" if self._type == "common" else "dev"
@@ -18,14 +33,20 @@ class Paratranz:
     async def download_from_paratranz(self) -> bool:
         """从 paratranz 下载汉化包"""
         os.makedirs(DIR_PARATRANZ, exist_ok=True)
-        with contextlib.suppress(httpx.TimeoutException):
-            await self.trigger_export()
+        async with shared_client(self._client) as client:
+            try:
+                fresh = await self.ensure_fresh_export(client)
+            except httpx.HTTPError as e:
+                logger.warning(f"\t!!! 获取导出状态失败: {e!r}")
+                fresh = False
+            if not fresh:
+                logger.warning(f"\t!!! 没等到新的{self._mention_name}导出，下载现有的汉化包")
 
-        async with httpx.AsyncClient(verify=False) as client:
             flag = False
             for _ in range(3):
                 try:
-                    await self.download_export(client)
+                    if not await self.download_export(client):
+                        continue
                     await self.unzip_export()
                 except (httpx.ConnectError, httpx.TimeoutException, BadZipfile) as e:
                     continue
@@ -37,22 +58,85 @@ class Paratranz:
                 return False
             return True
 
-    async def trigger_export(self):
-        """触发导出"""
+    async def ensure_fresh_export(self, client: httpx.AsyncClient) -> bool:
+        """
+        现有的导出比最后一次翻译改动还新就不再导出
+        否则触发导出，轮询到比触发时间新的导出为止
+        :return: 是否拿到了最新的导出
+        """
+        artifact_time = await self.fetch_artifact_time(client)
+        last_change = await self.fetch_last_change(client)
+        if artifact_time and last_change and artifact_time >= last_change:
+            logger.info(f"\t- 现有{self._mention_name}导出 ({artifact_time}) 已包含最后一次改动 ({last_change})，不再导出")
+            return True
+
+        triggered_at = await self.trigger_export(client)
+        if triggered_at is None:
+            return False
+        return await self.wait_for_export(client, triggered_at)
+
+    async def fetch_artifact_time(self, client: httpx.AsyncClient) -> datetime | None:
+        """最新一次导出的时间，没有导出过为 None"""
+        response = await client.get(f"{self._base_url}/projects/{self._project_id}/artifacts", headers=PARATRANZ_HEADERS)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        artifact = response.json() or {}
+        return self._parse_time(artifact.get("createdAt"))
+
+    async def fetch_last_change(self, client: httpx.AsyncClient) -> datetime | None:
+        """项目最后一次改动的时间"""
+        response = await client.get(f"{self._base_url}/projects/{self._project_id}", headers=PARATRANZ_HEADERS)
+        response.raise_for_status()
+        project = response.json() or {}
+        return self._parse_time(project.get("activeAt") or project.get("updatedAt"))
+
+    async def trigger_export(self, client: httpx.AsyncClient) -> datetime | None:
+        """触发导出，返回服务器上的触发时间，触发失败为 None"""
         logger.info(f"===== 开始导出{self._mention_name}汉化文件 ...")
-        url = f"{PARATRANZ_BASE_URL}/projects/{self._project_id}/artifacts"
-        httpx.post(url, headers=PARATRANZ_HEADERS, verify=False)
-        logger.info(f"##### {self._mention_name}汉化文件已导出 !\n")
+        url = f"{self._base_url}/projects/{self._project_id}/artifacts"
+        response = await client.post(url, headers=PARATRANZ_HEADERS)
+        if response.is_error:
+            logger.warning(f"\t!!! 触发导出失败 ({response.status_code})，需要管理员的 TOKEN")
+            return None
+        logger.info(f"##### {self._mention_name}汉化文件开始导出 !\n")
+        # 用服务器的时间，免得本地时钟不准；Date 只精确到秒
+        if date := response.headers.get("Date"):
+            return parsedate_to_datetime(date)
+        return datetime.now(timezone.utc).replace(microsecond=0)
+
+    async def wait_for_export(self, client: httpx.AsyncClient, since: datetime) -> bool:
+        """轮询到有比 since 新的导出为止，间隔指数增长"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.POLL_TIMEOUT
+        delay = self.POLL_INITIAL_DELAY
+        while True:
+            artifact_time = await self.fetch_artifact_time(client)
+            if artifact_time and artifact_time > since:
+                logger.info(f"\t- {self._mention_name}导出完成 ({artifact_time})")
+                return True
+            if loop.time() + delay > deadline:
+                logger.error(f"\t!!! 等待{self._mention_name}导出超时 ({self.POLL_TIMEOUT}s)")
+                return False
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.POLL_MAX_DELAY)
+
+    @staticmethod
+    def _parse_time(value: str | None) -> datetime | None:
+        """paratranz 的时间形如 2024-01-01T00:00:00.000Z"""
+        if not value:
+            return None
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
 
-    async def download_export(self, client: httpx.AsyncClient):
+    async def download_export(self, client: httpx.AsyncClient) -> bool:
         """下载文件"""
         logger.info(f"===== 开始下载{self._mention_name}汉化文件 ...")
-        url = f"{PARATRANZ_BASE_URL}/projects/{self._project_id}/artifacts/download"
-        headers = PARATRANZ_HEADERS
-        content = (await client.get(url, headers=headers, follow_redirects=True)).content
-        with open(DIR_TEMP_ROOT / f"paratranz_export{self._mention_name}.zip", "wb") as fp:
-            fp.write(content)
+        url = f"{self._base_url}/projects/{self._project_id}/artifacts/download"
+        if not await chunk_download(url, DIR_TEMP_ROOT / f"paratranz_export{self._mention_name}.zip", client, headers=PARATRANZ_HEADERS):
+            return False
         logger.info(f"##### {self._mention_name}汉化文件已下载 !\n")
+        return True
 
     async def unzip_export(self):
         """解压"""
@@ -1,37 +1,168 @@
 import re
+import time
+from enum import Enum
 from pathlib import Path
+from typing import Callable
 
 from .consts import *
-from .tools.process_variables import VariablesProcess
+from .tools.process_variables import SetRunMatcher, VariablesProcess
+
+# 判断用的正则都在这里编译好，逐行判断时只 search 不 findall
+PATTERN_LINE_START_WORD = re.compile(r"^(\w|- )")
+PATTERN_WIDGET_CASE_NUMBER = re.compile(r"<<case \d")
+PATTERN_WORN_NAME = re.compile(r"\$worn\..*?\.name")
+PATTERN_START_QUOTE_WORD = re.compile(r"^\"\w")
+PATTERN_TAG_SPAN_SIMPLE = re.compile(r"<span.*?>[\"\w]")
+
+PATTERN_JSON_LINE = re.compile(r"^[\w\"]*\s*:\s*[ `\'/\$\.\w\":,\|\(\)\{\}\[\]]+,*$")
+PATTERN_ALNUM = re.compile(r"[A-Za-z\d]")
+PATTERN_TAG_SPAN = re.compile(r"<span.*?>[\"\w\.\-+\$]")
+PATTERN_TAG_LABEL = re.compile(r"<label>[\w\-+]|\w</label>")
+PATTERN_TAG_INPUT = re.compile(r"<input.*?value=\"")
+PATTERN_WIDGET_NOTE = re.compile(r"<<note\s\"")
+PATTERN_WIDGET_PRINT = re.compile(r"<<(?:print|=|-)\s[^<]*[\"\'`\w]+[\-\?\s\w\.\$,\'\"<>\[\]\(\)/]+(?:\)>>|\">>|\'>>|`>>|\]>>|>>)")
+PATTERN_WIDGET_CASE = re.compile(r"<<(?:case|=|-)\s[^<]*[\"\'`\w]+[\-\?\s\w\.\$,\'\"<>\[\]\(\)/]+(?:\)>>|\">>|\'>>|`>>|\]>>|>>)")
+PATTERN_WIDGET_TEXTBOX = re.compile(r"<<textbox\s\"")
+PATTERN_WIDGET_NUMBER_STEPPER = re.compile(r"<<numberStepper\s\"")
+PATTERN_WIDGET_IF = re.compile(r"<<if\s.*?>>\w")
+PATTERN_WIDGET_OPTION = re.compile(r"<<option\s\"")
+# PATTERN_WIDGET_LINK = re.compile(r"<<link\s*(\[\[|\"\w|`\w|\'\w|\"\(|`\(|\'\(|_\w|`)")
+PATTERN_WIDGET_LINK = re.compile(r"<<link\s*(\[\[|\"\w|`\w|\'\w|\"\(|`\(|\'\(|_\w|`|\w)")
+
+# is_only_widgets 逐层去掉 <<>>, <>, $VAR; 去掉一层后前后会拼起来，所以不能合成一个正则
+PATTERN_ONLY_WIDGETS_WIDGET = re.compile(r"<<(?:[^<>]*?|run.*?|for.*?)>>")
+PATTERN_ONLY_WIDGETS_TAG = re.compile(r"<[/\s\w\"=\-@\$\+\'\.]*>")
+PATTERN_ONLY_WIDGETS_VAR = re.compile(r"(?:\$|_)[^_][#;\w\.\(\)\[\]\"\'`]*")
+ONLY_WIDGETS_HALF = {
+	"<<print either(",
+	"<<= either(",
+	"<<- either(",
+	"<<print [",
+	"<<= [",
+	"<<- [",
+}  # 特殊的半拉
+
+
+class ParserRegistry:
+	"""
+	(目录, 文件名) -> 抓取函数，在类里用装饰器登记，import 时就建好，解析时查字典
+	目录按 directory 登记的先后顺序匹配，和原先 if/elif 的顺序一致，先匹配上的目录说了算
+	新增特殊文件只需要写抓取函数再登记一下：
+		@TWEE_PARSERS.register(DirNamesTwee.BASE_SYSTEM, FileNamesTwee.JOURNAL_FULL)
+		def _parse_journal(self): ...
+	"""
+	def __init__(self):
+		self._dirs: list[tuple[str, bool, bool]] = []  # 按顺序匹配的 (目录名, 上级目录也算, 目录名包含就算)
+		self._files: dict[tuple[str, str], Callable] = {}  # (目录, 文件名): 抓取函数
+		self._file_fragments: dict[str, list[tuple[str, Callable]]] = {}  # 目录: [(文件名包含的文本, 抓取函数)]
+
+	def directory(self, name: Enum, parent: bool = False, fragment: bool = False):
+		"""
+		按顺序登记目录，没有特殊文件的目录也要登记，匹配上了就不再往下找
+		:param parent: 上级目录是它也算，如 base-system/ 下的子目录
+		:param fragment: 目录名包含这个文本就算，如 overworld-
+		"""
+		if any(name.value == dir_name for dir_name, _, _ in self._dirs):
+			raise ValueError(f"目录 {name.value} 已经登记过")
+		self._dirs.append((name.value, parent, fragment))
+
+	def register(self, directory: Enum, *filenames: Enum, fragment: bool = False) -> Callable[[Callable], Callable]:
+		"""
+		装饰器，directory 下的 filenames 用被装饰的函数抓
+		:param fragment: 文件名包含这个文本就算，优先于完整文件名，和原先 if/elif 的顺序一致
+		"""
+		if all(directory.value != dir_name for dir_name, _, _ in self._dirs):
+			raise ValueError(f"目录 {directory.value} 要先用 directory 登记")
+
+		def decorator(func: Callable) -> Callable:
+			for filename in filenames:
+				if fragment:
+					self._file_fragments.setdefault(directory.value, []).append((filename.value, func))
+					continue
+				key = (directory.value, filename.value)
+				if key in self._files:
+					raise ValueError(f"{key} 已经登记给 {self._files[key].__name__}")
+				self._files[key] = func
+			return func
+		return decorator
+
+	def resolve_directory(self, filedir: Path) -> str | None:
+		"""文件夹归到哪个登记的目录，按登记顺序第一个匹配上的"""
+		for dir_name, parent, fragment in self._dirs:
+			if fragment:
+				if dir_name in filedir.name:
+					return dir_name
+			elif dir_name == filedir.name or (parent and dir_name == filedir.parent.name):
+				return dir_name
+		return None
+
+	def resolve(self, filedir: Path, filename: str) -> Callable | None:
+		"""找不到返回 None，由调用方按常规抓"""
+		directory = self.resolve_directory(filedir)
+		if directory is None:
+			return None
+		for fragment, func in self._file_fragments.get(directory, ()):
+			if fragment in filename:
+				return func
+		return self._files.get((directory, filename))
+
+
+# 顺序就是原先 ParseTextTwee.parse 里 if/elif 的顺序
+TWEE_PARSERS = ParserRegistry()
+TWEE_PARSERS.directory(DirNamesTwee.NORMAL, fragment=True)  # overworld-* 都按常规抓
+TWEE_PARSERS.directory(DirNamesTwee.FRAMEWORK, parent=True)
+TWEE_PARSERS.directory(DirNamesTwee.CONFIG)
+TWEE_PARSERS.directory(DirNamesTwee.VARIABLES)
+TWEE_PARSERS.directory(DirNamesTwee.BASE_CLOTHING)
+TWEE_PARSERS.directory(DirNamesTwee.BASE_COMBAT, parent=True)
+TWEE_PARSERS.directory(DirNamesTwee.BASE_DEBUG)  # 没有特殊文件，但 base-system/base-debug/ 不能归到 base-system
+TWEE_PARSERS.directory(DirNamesTwee.BASE_SYSTEM, parent=True)
+TWEE_PARSERS.directory(DirNamesTwee.FLAVOUR_TEXT_GENERATORS)
+
+# 顺序就是原先 ParseTextJS.parse 里 if/elif 的顺序
+JS_PARSERS = ParserRegistry()
+JS_PARSERS.directory(DirNamesJS.CONFIG)
+JS_PARSERS.directory(DirNamesJS.SETUP)
+JS_PARSERS.directory(DirNamesJS.HELPERS)
+JS_PARSERS.directory(DirNamesJS.JAVASCRIPT)
+JS_PARSERS.directory(DirNamesJS.VARIABLES)
+JS_PARSERS.directory(DirNamesJS.SPECIAL_MASTURBATION)
+JS_PARSERS.directory(DirNamesJS.PREGNANCY)
+JS_PARSERS.directory(DirNamesJS.TEMPLATES)
+JS_PARSERS.directory(DirNamesJS.EXTERNAL)
+JS_PARSERS.directory(DirNamesJS.BASE_CLOTHING)
+JS_PARSERS.directory(DirNamesJS.BASE_SYSTEM)
+JS_PARSERS.directory(DirNamesJS.MAIN)
+JS_PARSERS.directory(DirNamesJS.RENDERER)
+JS_PARSERS.directory(DirNamesJS.LOC_FORESTSHOP)
 
 
 class ParseTextTwee:
-	def __init__(self, lines: list[str], filepath: Path):
+	def __init__(self, lines: list[str], filepath: Path, set_run_lines: list[str] | None = None):
+		"""
+		:param set_run_lines: 本文件中所有 <<set>>/<<run>>，由 VariablesProcess.fetch_set_run_index 统一生成；不传则现查
+		"""
 		self._lines = lines
 		self._filepath = filepath
 
 		self._filename = self._filepath.name  # 文件名
 		self._filedir = self._filepath.parent  # 文件夹
 
-		self._categorize_all_set_run: list[dict] | None = None
+		self._set_run_lines = set_run_lines
 		self._set_run_bool_list = []
+		self._handler_name: str | None = None  # parse 实际用的抓取函数
+		self._elapsed: float = 0
 
 	def pre_parse_set_run(self, debug: bool = False):
-		varp = VariablesProcess()
-		varp.fetch_all_file_paths()
-		self._categorize_all_set_run = varp.fetch_all_set_content()
+		compared_lines = self._set_run_lines
+		if compared_lines is None:
+			compared_lines = VariablesProcess().fetch_set_run_index().get(self._filepath)
 
-		flag = False
-		for item in self._categorize_all_set_run:
-			if Path(item["path"]) == self._filepath:
-				flag = True
-				compared_lines: list[str] = item["lines"]
-
-		if not flag:
+		if not compared_lines:
 			return
 
+		matcher = SetRunMatcher(compared_lines)
 		for line in self._lines:
-			flag = False
 			line = line.strip()
 			if not line:
 				self._set_run_bool_list.append(False)
@@ -41,16 +172,7 @@ class ParseTextTwee:
 				self._set_run_bool_list.append(False)
 				continue
 
-			for set_run_line in compared_lines:
-				if set_run_line not in line:
-					continue
-
-				self._set_run_bool_list.append(True)
-				flag = True
-				break
-
-			if not flag:
-				self._set_run_bool_list.append(False)
+			self._set_run_bool_list.append(matcher.search(line))
 
 		if debug:
 			for idx, flag in enumerate(self._set_run_bool_list):
@@ -65,46 +187,27 @@ class ParseTextTwee:
 		return self._set_run_bool_list
 
 	def parse(self) -> list[bool]:
-		if DirNamesTwee.NORMAL.value in self._filedir.name:
-			return self.parse_normal()
-		elif DirNamesTwee.FRAMEWORK.value in {
-			self._filedir.name,
-			self._filedir.parent.name,
-		}:
-			return self.parse_framework()
-		elif DirNamesTwee.CONFIG.value == self._filedir.name:
-			return self.parse_config()
-		elif DirNamesTwee.VARIABLES.value == self._filedir.name:
-			return self.parse_variables()
-		elif DirNamesTwee.BASE_CLOTHING.value == self._filedir.name:
-			return self.parse_base_clothing()
-		elif DirNamesTwee.BASE_COMBAT.value in {
-			self._filedir.name,
-			self._filedir.parent.name,
-		}:
-			return self.parse_base_combat()
-		elif DirNamesTwee.BASE_DEBUG.value == self._filedir.name:
-			return self.parse_base_debug()
-		# elif DirNamesTwee.BASE_HAIR.value == self._filedir.name:
-		#     return self.parse_base_hair()
-		elif DirNamesTwee.BASE_SYSTEM.value in {
-			self._filedir.name,
-			self._filedir.parent.name,
-		}:
-			return self.parse_base_system()
-		elif DirNamesTwee.FLAVOUR_TEXT_GENERATORS.value == self._filedir.name:
-			return self.parse_flavour_text()
-
-		return self.parse_normal()
+		"""按目录和文件名找登记的抓取函数，没登记的按常规抓"""
+		handler = TWEE_PARSERS.resolve(self._filedir, self._filename) or ParseTextTwee.parse_normal
+		self._handler_name = handler.__name__
+		start = time.perf_counter()
+		results = handler(self)
+		self._elapsed = time.perf_counter() - start
+		return results
 
-	"""√ framework-tools """
+	@property
+	def handler_name(self) -> str | None:
+		"""实际用的抓取函数名"""
+		return self._handler_name
+
+	@property
+	def elapsed(self) -> float:
+		"""parse 的耗时 (秒)"""
+		return self._elapsed
 
-	def parse_framework(self):
-		"""00-framework-tools"""
-		if FileNamesTwee.WAITING_ROOM_FULL.value == self._filename:
-			return self._parse_waiting_room()
-		return self.parse_normal()
+	"""√ framework-tools """
 
+	@TWEE_PARSERS.register(DirNamesTwee.FRAMEWORK, FileNamesTwee.WAITING_ROOM_FULL)
 	def _parse_waiting_room(self):
 		"""很少很简单"""
 		return [
@@ -118,14 +221,7 @@ class ParseTextTwee:
 
 	"""√ config """
 
-	def parse_config(self):
-		"""01-config"""
-		if FileNamesTwee.START_FULL.value == self._filename:
-			return self._parse_start()
-		elif FileNamesTwee.VERSION_INFO_FULL.value == self._filename:
-			return self._parse_version_info()
-		return self.parse_normal()
-
+	@TWEE_PARSERS.register(DirNamesTwee.CONFIG, FileNamesTwee.START_FULL)
 	def _parse_start(self):
 		"""很少很简单"""
 		return [
@@ -136,11 +232,12 @@ class ParseTextTwee:
 				or "checkbox" in line.strip()
 				or "button" in line.strip()
 				or "dialog" in line.strip()
-				or any(re.findall(r"^(\w|- )", line.strip()))
+				or PATTERN_LINE_START_WORD.search(line.strip()) is not None
 			)
 			for line in self._lines
 		]
 
+	@TWEE_PARSERS.register(DirNamesTwee.CONFIG, FileNamesTwee.VERSION_INFO_FULL)
 	def _parse_version_info(self):
 		"""很少很简单"""
 		return [
@@ -153,32 +250,19 @@ class ParseTextTwee:
 
 	"""√ variables """
 
-	def parse_variables(self):
-		"""04-Variables"""
-		if FileNamesTwee.CANVASMODEL_FULL.value == self._filename:
-			return self._parse_canvasmodel()
-		elif FileNamesTwee.VERSION_UPDATE_FULL.value == self._filename:
-			return self._parse_version_update()
-		elif FileNamesTwee.PASSAGE_FOOTER_FULL.value == self._filename:
-			return self._parse_passage_footer()
-		elif FileNamesTwee.PREGNANCY_VAR_FULL.value == self._filename:
-			return self._parse_pregnancy_var()
-		elif FileNamesTwee.VARIABLES_STATIC_FULL.value == self._filename:
-			return self._parse_variables_static()
-		elif FileNamesTwee.HAIR_STYLES_FULL.value == self._filename:
-			return self._parse_hair_style()
-		return self.parse_normal()
-
+	@TWEE_PARSERS.register(DirNamesTwee.VARIABLES, FileNamesTwee.CANVASMODEL_FULL)
 	def _parse_canvasmodel(self):
 		"""只有一个<<link"""
 		return self.parse_type_only("<<link [[")
 
+	@TWEE_PARSERS.register(DirNamesTwee.VARIABLES, FileNamesTwee.VERSION_UPDATE_FULL)
 	def _parse_version_update(self):
 		"""只有 <span 和 <<link"""
 		return self.parse_type_only(
 			{"<span ", "<<link ", "replace(/[^a-zA-Z", "if $earSlime.event"}
 		)
 
+	@TWEE_PARSERS.register(DirNamesTwee.VARIABLES, FileNamesTwee.PASSAGE_FOOTER_FULL)
 	def _parse_passage_footer(self):
 		"""有点麻烦"""
 		results = []
@@ -210,10 +294,12 @@ class ParseTextTwee:
 				results.append(False)
 		return results
 
+	@TWEE_PARSERS.register(DirNamesTwee.VARIABLES, FileNamesTwee.PREGNANCY_VAR_FULL)
 	def _parse_pregnancy_var(self):
 		"""只有 "name":"""
 		return self.parse_type_only({'"name": '})
 
+	@TWEE_PARSERS.register(DirNamesTwee.VARIABLES, FileNamesTwee.VARIABLES_STATIC_FULL)
 	def _parse_variables_static(self):
 		"""variables-static.twee"""
 		results = []
@@ -269,22 +355,7 @@ class ParseTextTwee:
 
 	"""√ base-clothing """
 
-	def parse_base_clothing(self):
-		"""base-clothing"""
-		if FileNamesTwee.CAPTIONTEXT_FULL.value == self._filename:
-			return self._parse_captiontext()
-		# elif FileNamesTwee.CLOTHING.value in self._filename and FileNamesTwee.CLOTHING_SETS_FULL.value != self._filename:
-		#     return self._parse_clothing()
-		elif FileNamesTwee.CLOTHING_SETS_FULL.value == self._filename:
-			return self._parse_clothing_sets()
-		elif FileNamesTwee.CLOTHING_IMAGES_FULL.value == self._filename:
-			return self._parse_clothing_images()
-		elif FileNamesTwee.INIT_FULL.value == self._filename:
-			return self._parse_clothing_init()
-		elif FileNamesTwee.WARDROBES_FULL.value == self._filename:
-			return self._parse_wardrobes()
-		return self.parse_normal()
-
+	@TWEE_PARSERS.register(DirNamesTwee.BASE_CLOTHING, FileNamesTwee.CAPTIONTEXT_FULL)
 	def _parse_captiontext(self):
 		"""有点麻烦"""
 		results = []
@@ -307,10 +378,12 @@ class ParseTextTwee:
 
 		return results
 
+	# @TWEE_PARSERS.register(DirNamesTwee.BASE_CLOTHING, FileNamesTwee.CLOTHING, fragment=True)
 	# def _parse_clothing(self):
 	#     """json"""
 	#     return self.parse_type_only({"name_cap:", "description:", "<<link `"})
 
+	@TWEE_PARSERS.register(DirNamesTwee.BASE_CLOTHING, FileNamesTwee.CLOTHING_SETS_FULL)
 	def _parse_clothing_sets(self):
 		"""好麻烦"""
 		results = []
@@ -391,14 +464,17 @@ class ParseTextTwee:
 				results.append(True)
 		return results
 
+	@TWEE_PARSERS.register(DirNamesTwee.BASE_CLOTHING, FileNamesTwee.CLOTHING_IMAGES_FULL)
 	def _parse_clothing_images(self):
 		"""只有 <span"""
 		return self.parse_type_only("<span ")
 
+	@TWEE_PARSERS.register(DirNamesTwee.BASE_CLOTHING, FileNamesTwee.INIT_FULL)
 	def _parse_clothing_init(self):
 		"""只有 desc:"""
 		return self.parse_type_only({"desc:", "V.outfit = ", 'word:"', 'name: "'})
 
+	@TWEE_PARSERS.register(DirNamesTwee.BASE_CLOTHING, FileNamesTwee.WARDROBES_FULL)
 	def _parse_wardrobes(self):
 		"""多了一个<<wearlink_norefresh " """
 		results = []
@@ -477,44 +553,8 @@ class ParseTextTwee:
 
 	"""√ base-combat """
 
-	def parse_base_combat(self):
-		"""base-combat"""
-		if (
-			FileNamesTwee.ACTIONS_FULL.value == self._filename
-			or FileNamesTwee.ACTIONS.value in self._filename
-		):
-			return self._parse_actions()
-		if FileNamesTwee.STALK_FULL.value == self._filename:
-			return self._parse_stalk()
-		elif FileNamesTwee.GENERATION.value in self._filename:
-			return self._parse_generation()
-		elif FileNamesTwee.TENTACLE_ADV_FULL.value == self._filename:
-			return self._parse_tentacle_adv()
-		elif FileNamesTwee.TENTACLES_FULL.value == self._filename:
-			return self._parse_tentacles()
-		elif FileNamesTwee.COMBAT_EFFECTS_FULL.value == self._filename:
-			return self._parse_combat_effects()
-		elif self._filename in {
-			FileNamesTwee.NPC_GENERATION_FULL.value,
-			FileNamesTwee.NPC_DAMAGE_FULL.value,
-		}:
-			return self._parse_npc_span()
-		elif FileNamesTwee.SPEECH_SYDNEY_FULL.value == self._filename:
-			return self._parse_speech_sydney()
-		elif FileNamesTwee.SPEECH_FULL.value == self._filename:
-			return self._parse_speech()
-		elif FileNamesTwee.STRUGGLE_FULL.value == self._filename:
-			return self._parse_struggle()
-		elif FileNamesTwee.SWARMS_FULL.value == self._filename:
-			return self._parse_swarms()
-		elif FileNamesTwee.SWARM_EFFECTS_FULL.value == self._filename:
-			return self._parse_swarm_effects()
-		elif FileNamesTwee.COMBAT_WIDGETS_FULL.value == self._filename:
-			return self._parse_combat_widgets()
-		elif FileNamesTwee.COMBAT_IMAGES_FULL.value == self._filename:
-			return self._parse_combat_images()
-		return self.parse_normal()
-
+	@TWEE_PARSERS.register(DirNamesTwee.BASE_COMBAT, FileNamesTwee.ACTIONS_FULL)
+	@TWEE_PARSERS.register(DirNamesTwee.BASE_COMBAT, FileNamesTwee.ACTIONS, fragment=True)
 	def _parse_actions(self):
 		"""麻烦"""
 		results = []
@@ -567,6 +607,7 @@ class ParseTextTwee:
 				results.append(True)
 		return results
 
+	@TWEE_PARSERS.register(DirNamesTwee.BASE_COMBAT, FileNamesTwee.STALK_FULL)
 	def _parse_stalk(self):
 		"""麻烦"""
 		results = []
@@ -615,6 +656,7 @@ class ParseTextTwee:
 				results.append(True)
 		return results
 
+	@TWEE_PARSERS.register(DirNamesTwee.BASE_COMBAT, FileNamesTwee.GENERATION, fragment=True)
 	def _parse_generation(self):
 		"""只有 <span"""
 		results = []
@@ -643,6 +685,7 @@ class ParseTextTwee:
 				results.append(False)
 		return results
 
+	@TWEE_PARSERS.register(DirNamesTwee.BASE_COMBAT, FileNamesTwee.TENTACLE_ADV_FULL)
 	def _parse_tentacle_adv(self):
 		"""有点麻烦"""
 		results = []
@@ -677,6 +720,7 @@ class ParseTextTwee:
 				results.append(True)
 		return results
 
+	@TWEE_PARSERS.register(DirNamesTwee.BASE_COMBAT, FileNamesTwee.TENTACLES_FULL)
 	def _parse_tentacles(self):
 		"""有点麻烦"""
 		results = []
@@ -706,6 +750,7 @@ class ParseTextTwee:
 				results.append(False)
 		return results
 
+	@TWEE_PARSERS.register(DirNamesTwee.BASE_COMBAT, FileNamesTwee.COMBAT_EFFECTS_FULL)
 	def _parse_combat_effects(self):
 		"""有点麻烦"""
 		results = []
@@ -754,6 +799,7 @@ class ParseTextTwee:
 				results.append(True)
 		return results
 
+	@TWEE_PARSERS.register(DirNamesTwee.BASE_COMBAT, FileNamesTwee.NPC_GENERATION_FULL, FileNamesTwee.NPC_DAMAGE_FULL)
 	def _parse_npc_span(self):
 		"""只有 <span"""
 		return self.parse_type_only(
@@ -764,6 +810,7 @@ class ParseTextTwee:
 			}
 		)
 
+	@TWEE_PARSERS.register(DirNamesTwee.BASE_COMBAT, FileNamesTwee.SPEECH_SYDNEY_FULL)
 	def _parse_speech_sydney(self):
 		"""有点麻烦"""
 		results = []
@@ -783,6 +830,7 @@ class ParseTextTwee:
 				results.append(True)
 		return results
 
+	@TWEE_PARSERS.register(DirNamesTwee.BASE_COMBAT, FileNamesTwee.SPEECH_FULL)
 	def _parse_speech(self):
 		"""有点麻烦"""
 		results = []
@@ -816,7 +864,7 @@ class ParseTextTwee:
 				or line.startswith("<<bHe>> ")
 				or line.startswith("<<His>> ")
 				or "<span " in line
-				or any(re.findall(r"<<case \d", line))
+				or PATTERN_WIDGET_CASE_NUMBER.search(line)
 			):
 				results.append(True)
 			elif self.is_only_widgets(line):
@@ -825,6 +873,7 @@ class ParseTextTwee:
 				results.append(False)
 		return results
 
+	@TWEE_PARSERS.register(DirNamesTwee.BASE_COMBAT, FileNamesTwee.STRUGGLE_FULL)
 	def _parse_struggle(self):
 		"""有点麻烦"""
 		results = []
@@ -849,6 +898,7 @@ class ParseTextTwee:
 				results.append(True)
 		return results
 
+	@TWEE_PARSERS.register(DirNamesTwee.BASE_COMBAT, FileNamesTwee.SWARMS_FULL)
 	def _parse_swarms(self):
 		"""有点麻烦"""
 		results = []
@@ -857,7 +907,7 @@ class ParseTextTwee:
 			if not line:
 				results.append(False)
 				continue
-			if re.findall(r"\$worn\..*?\.name", line):
+			if PATTERN_WORN_NAME.search(line):
 				results.append(True)
 			elif (
 				self.is_comment(line)
@@ -872,6 +922,7 @@ class ParseTextTwee:
 				results.append(True)
 		return results
 
+	@TWEE_PARSERS.register(DirNamesTwee.BASE_COMBAT, FileNamesTwee.SWARM_EFFECTS_FULL)
 	def _parse_swarm_effects(self):
 		results = []
 		for line in self._lines:
@@ -892,6 +943,7 @@ class ParseTextTwee:
 				results.append(True)
 		return results
 
+	@TWEE_PARSERS.register(DirNamesTwee.BASE_COMBAT, FileNamesTwee.COMBAT_WIDGETS_FULL)
 	def _parse_combat_widgets(self):
 		"""有点麻烦"""
 		results = []
@@ -922,6 +974,7 @@ class ParseTextTwee:
 				results.append(True)
 		return results
 
+	@TWEE_PARSERS.register(DirNamesTwee.BASE_COMBAT, FileNamesTwee.COMBAT_IMAGES_FULL)
 	def _parse_combat_images(self):
 		results = []
 		for idx, line in enumerate(self._lines):
@@ -936,85 +989,16 @@ class ParseTextTwee:
 				results.append(False)
 		return results
 
-	""" base-debug """
-
-	def parse_base_debug(self):
-		return self.parse_normal()
-
 	"""√ base-hair """
-	# def parse_base_hair(self):
-	#     if FileNamesTwee.HAIR_STYLES_FULL.value == self._filename:
-	#         return self._parse_hair_style()
-	#     return self.parse_normal()
 
+	@TWEE_PARSERS.register(DirNamesTwee.VARIABLES, FileNamesTwee.HAIR_STYLES_FULL)
 	def _parse_hair_style(self):
 		"""json"""
 		return self.parse_type_only("name_cap")
 
 	""" base-system """
 
-	def parse_base_system(self):
-		"""base-system"""
-		if FileNamesTwee.CHARACTERISTICS_FULL.value == self._filename:
-			return self._parse_characteristic()
-		elif FileNamesTwee.SOCIAL_FULL.value == self._filename:
-			return self._parse_social()
-		elif FileNamesTwee.TRAITS_FULL.value == self._filename:
-			return self._parse_traits()
-		elif FileNamesTwee.BODYWRITING_FULL.value == self._filename:
-			return self._parse_body_writing()
-		elif FileNamesTwee.BODYWRITING_OBJECTS_FULL.value == self._filename:
-			return self._parse_body_writing_objects()
-		elif FileNamesTwee.CAPTION_FULL.value == self._filename:
-			return self._parse_caption()
-		elif self._filename in {
-			FileNamesTwee.DEVIANCY_FULL.value,
-			FileNamesTwee.SYSTEM_EXHIBITIONISM_FULL.value,
-			FileNamesTwee.PROMISCUITY_FULL.value,
-		}:
-			return self._parse_sex_stat()
-		elif FileNamesTwee.FAME_FULL.value == self._filename:
-			return self._parse_fame()
-		# elif FileNamesTwee.FEATS_FULL.value == self._filename:
-		# 	return self._parse_feats()
-		elif FileNamesTwee.CLOTHING_IMAGES_FULL.value == self._filename:
-			return self._parse_system_images()
-		elif FileNamesTwee.MOBILE_STATS_FULL.value == self._filename:
-			return self._parse_mobile_stats()
-		elif FileNamesTwee.NAME_LIST_FULL.value == self._filename:
-			return self._parse_name_list()
-		elif FileNamesTwee.NICKNAMES_FULL.value == self._filename:
-			return self._parse_nicknames()
-		elif FileNamesTwee.PLANT_OBJECTS_FULL.value == self._filename:
-			return self._parse_plant_objects()
-		elif FileNamesTwee.RADIO_FULL.value == self._filename:
-			return self._parse_radio()
-		elif FileNamesTwee.SETTINGS_FULL.value == self._filename:
-			return self._parse_settings()
-		elif FileNamesTwee.SKILL_DIFFICULTIES_FULL.value == self._filename:
-			return self._parse_skill_difficulties()
-		elif FileNamesTwee.SLEEP_FULL.value == self._filename:
-			return self._parse_sleep()
-		elif FileNamesTwee.STAT_CHANGES_FULL.value == self._filename:
-			return self._parse_stat_changes()
-		elif FileNamesTwee.TENDING_FULL.value == self._filename:
-			return self._parse_tending()
-		elif FileNamesTwee.TEXT_FULL.value == self._filename:
-			return self._parse_system_text()
-		elif FileNamesTwee.TIME_FULL.value == self._filename:
-			return self._parse_time()
-		elif FileNamesTwee.TIPS_FULL.value == self._filename:
-			return self._parse_tips()
-		elif FileNamesTwee.TRANSFORMATIONS_FULL.value == self._filename:
-			return self._parse_transformations()
-		elif FileNamesTwee.SYSTEM_WIDGETS_FULL.value == self._filename:
-			return self._parse_system_widgets()
-		elif FileNamesTwee.NAMED_NPCS_FULL.value == self._filename:
-			return self._parse_named_npcs()
-		elif FileNamesTwee.PERSISTENT_NPCS_FULL.value == self._filename:
-			return self._parse_persistent_npcs()
-		return self.parse_normal()
-
+	@TWEE_PARSERS.register(DirNamesTwee.BASE_SYSTEM, FileNamesTwee.CHARACTERISTICS_FULL)
 	def _parse_characteristic(self):
 		"""有点麻烦"""
 		results = []
@@ -1051,6 +1035,7 @@ class ParseTextTwee:
 				results.append(True)
 		return results
 
+	@TWEE_PARSERS.register(DirNamesTwee.BASE_SYSTEM, FileNamesTwee.SOCIAL_FULL)
 	def _parse_social(self):
 		"""有点麻烦"""
 		results = []
@@ -1074,6 +1059,7 @@ class ParseTextTwee:
 				results.append(True)
 		return results
 
+	@TWEE_PARSERS.register(DirNamesTwee.BASE_SYSTEM, FileNamesTwee.TRAITS_FULL)
 	def _parse_traits(self):
 		"""half-json"""
 		return self.parse_type_only(
@@ -1093,6 +1079,7 @@ class ParseTextTwee:
 			}
 		)
 
+	@TWEE_PARSERS.register(DirNamesTwee.BASE_SYSTEM, FileNamesTwee.BODYWRITING_FULL)
 	def _parse_body_writing(self):
 		"""有点麻烦"""
 		results = []
@@ -1112,10 +1099,12 @@ class ParseTextTwee:
 				results.append(True)
 		return results
 
+	@TWEE_PARSERS.register(DirNamesTwee.BASE_SYSTEM, FileNamesTwee.BODYWRITING_OBJECTS_FULL)
 	def _parse_body_writing_objects(self):
 		"""half-json"""
 		return self.parse_type_only({"writing: ", "special: ", "sprites: "})
 
+	@TWEE_PARSERS.register(DirNamesTwee.BASE_SYSTEM, FileNamesTwee.CAPTION_FULL)
 	def _parse_caption(self):
 		"""竟然还有css"""
 		results = []
@@ -1153,6 +1142,7 @@ class ParseTextTwee:
 				results.append(True)
 		return results
 
+	@TWEE_PARSERS.register(DirNamesTwee.BASE_SYSTEM, FileNamesTwee.DEVIANCY_FULL, FileNamesTwee.SYSTEM_EXHIBITIONISM_FULL, FileNamesTwee.PROMISCUITY_FULL)
 	def _parse_sex_stat(self):
 		"""纯文本 和 span"""
 		results = []
@@ -1177,10 +1167,12 @@ class ParseTextTwee:
 
 		return results
 
+	@TWEE_PARSERS.register(DirNamesTwee.BASE_SYSTEM, FileNamesTwee.FAME_FULL)
 	def _parse_fame(self):
 		"""set $_output to"""
 		return self.parse_type_only({"<<set $_output"})
 
+	# @TWEE_PARSERS.register(DirNamesTwee.BASE_SYSTEM, FileNamesTwee.FEATS_FULL)
 	# def _parse_feats(self):
 	# 	"""json"""
 	# 	return self.parse_type_only({
@@ -1190,18 +1182,22 @@ class ParseTextTwee:
 	# 		"name :"
 	# 	})
 
+	@TWEE_PARSERS.register(DirNamesTwee.BASE_SYSTEM, FileNamesTwee.CLOTHING_IMAGES_FULL)
 	def _parse_system_images(self):
 		"""只有span"""
-		return self.parse_type_only_regex(r"<span.*?>[\"\w]")
+		return self.parse_type_only_regex(PATTERN_TAG_SPAN_SIMPLE)
 
+	@TWEE_PARSERS.register(DirNamesTwee.BASE_SYSTEM, FileNamesTwee.MOBILE_STATS_FULL)
 	def _parse_mobile_stats(self):
 		"""只有<span>"""
 		return self.parse_type_only("<span>")
 
+	@TWEE_PARSERS.register(DirNamesTwee.BASE_SYSTEM, FileNamesTwee.NAME_LIST_FULL)
 	def _parse_name_list(self):
 		"""只有 " """
 		return self.parse_type_startwith('"')
 
+	@TWEE_PARSERS.register(DirNamesTwee.BASE_SYSTEM, FileNamesTwee.NAMED_NPCS_FULL)
 	def _parse_named_npcs(self):
 		"""有点麻烦"""
 		results = []
@@ -1267,6 +1263,7 @@ class ParseTextTwee:
 				results.append(True)
 		return results
 
+	@TWEE_PARSERS.register(DirNamesTwee.BASE_SYSTEM, FileNamesTwee.NICKNAMES_FULL)
 	def _parse_nicknames(self):
 		"""只有 " """
 		results = []
@@ -1303,10 +1300,12 @@ class ParseTextTwee:
 			results.append(False)
 		return results
 
+	@TWEE_PARSERS.register(DirNamesTwee.BASE_SYSTEM, FileNamesTwee.PLANT_OBJECTS_FULL)
 	def _parse_plant_objects(self):
 		"""json"""
 		return self.parse_type_only({"plural:", "singular:"})
 
+	@TWEE_PARSERS.register(DirNamesTwee.BASE_SYSTEM, FileNamesTwee.RADIO_FULL)
 	def _parse_radio(self):
 		"""有点麻烦"""
 		results = []
@@ -1339,13 +1338,14 @@ class ParseTextTwee:
 				self.is_widget_link(line)
 				or "<i>" in line
 				or "<b>" in line
-				or any(re.findall(r"^\"\w", line))
+				or PATTERN_START_QUOTE_WORD.search(line)
 			):
 				results.append(True)
 			else:
 				results.append(False)
 		return results
 
+	@TWEE_PARSERS.register(DirNamesTwee.BASE_SYSTEM, FileNamesTwee.SETTINGS_FULL)
 	def _parse_settings(self):
 		"""草"""
 		results = []
@@ -1403,6 +1403,7 @@ class ParseTextTwee:
 				results.append(True)
 		return results
 
+	@TWEE_PARSERS.register(DirNamesTwee.BASE_SYSTEM, FileNamesTwee.SKILL_DIFFICULTIES_FULL)
 	def _parse_skill_difficulties(self):
 		"""麻烦"""
 		results = []
@@ -1441,6 +1442,7 @@ class ParseTextTwee:
 				results.append(True)
 		return results
 
+	@TWEE_PARSERS.register(DirNamesTwee.BASE_SYSTEM, FileNamesTwee.SLEEP_FULL)
 	def _parse_sleep(self):
 		"""<span , <<link, 纯文本"""
 		return [
@@ -1460,10 +1462,12 @@ class ParseTextTwee:
 			for line in self._lines
 		]
 
+	@TWEE_PARSERS.register(DirNamesTwee.BASE_SYSTEM, FileNamesTwee.STAT_CHANGES_FULL)
 	def _parse_stat_changes(self):
 		"""只有<span"""
 		return self.parse_type_only("<span ")
 
+	@TWEE_PARSERS.register(DirNamesTwee.BASE_SYSTEM, FileNamesTwee.TENDING_FULL)
 	def _parse_tending(self):
 		"""麻烦"""
 		results = []
@@ -1507,6 +1511,7 @@ class ParseTextTwee:
 				results.append(False)
 		return results
 
+	@TWEE_PARSERS.register(DirNamesTwee.BASE_SYSTEM, FileNamesTwee.TEXT_FULL)
 	def _parse_system_text(self):
 		"""麻烦"""
 		results = []
@@ -1562,14 +1567,17 @@ class ParseTextTwee:
 				results.append(True)
 		return results
 
+	@TWEE_PARSERS.register(DirNamesTwee.BASE_SYSTEM, FileNamesTwee.TIME_FULL)
 	def _parse_time(self):
 		"""只有<span"""
 		return self.parse_type_only("<span ")
 
+	@TWEE_PARSERS.register(DirNamesTwee.BASE_SYSTEM, FileNamesTwee.TIPS_FULL)
 	def _parse_tips(self):
 		"""只有<h3>和 " """
 		return self.parse_type_startwith({'"', "<h3>", "<<link"})
 
+	@TWEE_PARSERS.register(DirNamesTwee.BASE_SYSTEM, FileNamesTwee.TRANSFORMATIONS_FULL)
 	def _parse_transformations(self):
 		"""<span, <<print, 纯文本"""
 		return [
@@ -1590,6 +1598,7 @@ class ParseTextTwee:
 			for line in self._lines
 		]
 
+	@TWEE_PARSERS.register(DirNamesTwee.BASE_SYSTEM, FileNamesTwee.SYSTEM_WIDGETS_FULL)
 	def _parse_system_widgets(self):
 		results = []
 		multirow_comment_flag = False
@@ -1672,6 +1681,7 @@ class ParseTextTwee:
 				results.append(True)
 		return results
 
+	@TWEE_PARSERS.register(DirNamesTwee.BASE_SYSTEM, FileNamesTwee.PERSISTENT_NPCS_FULL)
 	def _parse_persistent_npcs(self):
 		results = []
 		for line in self._lines:
@@ -1685,16 +1695,7 @@ class ParseTextTwee:
 
 	""" flavour-text-generators """
 
-	def parse_flavour_text(self):
-		"""flavour-text-generators"""
-		if FileNamesTwee.BODY_COMMENTS_FULL.value == self._filename:
-			return self._parse_body_comments()
-		elif FileNamesTwee.EXHIBITIONISM_FULL.value == self._filename:
-			return self._parse_exhibitionism()
-		elif FileNamesTwee.EZ_THESAURUS_FULL.value == self._filename:
-			return self._parse_thesaurus()
-		return self.parse_normal()
-
+	@TWEE_PARSERS.register(DirNamesTwee.FLAVOUR_TEXT_GENERATORS, FileNamesTwee.BODY_COMMENTS_FULL)
 	def _parse_body_comments(self):
 		"""json"""
 		results = []
@@ -1720,6 +1721,7 @@ class ParseTextTwee:
 				results.append(False)
 		return results
 
+	@TWEE_PARSERS.register(DirNamesTwee.FLAVOUR_TEXT_GENERATORS, FileNamesTwee.EXHIBITIONISM_FULL)
 	def _parse_exhibitionism(self):
 		"""json"""
 		results = []
@@ -1749,6 +1751,7 @@ class ParseTextTwee:
 				results.append(False)
 		return results
 
+	@TWEE_PARSERS.register(DirNamesTwee.FLAVOUR_TEXT_GENERATORS, FileNamesTwee.EZ_THESAURUS_FULL)
 	def _parse_thesaurus(self):
 		"""json"""
 		return self.parse_type_between(["<<set _possibilities to ["], ["]>>"])
@@ -2160,16 +2163,16 @@ class ParseTextTwee:
 			for line in self._lines
 		]
 
-	def parse_type_only_regex(self, pattern: str | set[str]) -> list[bool]:
+	def parse_type_only_regex(self, pattern: str | re.Pattern | set[str | re.Pattern]) -> list[bool]:
 		"""指文件中只有一种或几种正则格式需要提取"""
-		if isinstance(pattern, str):
+		if isinstance(pattern, (str, re.Pattern)):
 			return [
-				line.strip() and any(re.findall(pattern, line.strip()))
+				line.strip() and re.search(pattern, line.strip()) is not None
 				for line in self._lines
 			]
 
 		return [
-			line.strip() and any(re.findall(_, line.strip()) for _ in pattern)
+			line.strip() and any(re.search(_, line.strip()) for _ in pattern)
 			for line in self._lines
 		]
 
@@ -2225,25 +2228,19 @@ class ParseTextTwee:
 	@staticmethod
 	def is_comment(line: str) -> bool:
 		"""注释"""
-		if line.startswith("*") or line.startswith("*/") or line.startswith("-->"):
+		if line.startswith(("*", "-->")):
 			return True
-		return (
-				any(line.startswith(_) for _ in {"/*", "<!--"})
-				and
-				any(line.endswith(_) for _ in {"*/", "-->"})
-		)
+		return line.startswith(("/*", "<!--")) and line.endswith(("*/", "-->"))
 
 	@staticmethod
 	def is_json_line(line: str) -> bool:
 		"""xxx: yyy"""
-		return any(
-			re.findall(r"^[\w\"]*\s*:\s*[ `\'/\$\.\w\":,\|\(\)\{\}\[\]]+,*$", line)
-		)
+		return PATTERN_JSON_LINE.search(line) is not None
 
 	@staticmethod
 	def is_only_marks(line: str) -> bool:
 		"""只有符号没字母数字"""
-		return not any(re.findall(r"([A-Za-z\d]+)", line))
+		return PATTERN_ALNUM.search(line) is None
 
 	@staticmethod
 	def is_event(line: str) -> bool:
@@ -2253,145 +2250,107 @@ class ParseTextTwee:
 	@staticmethod
 	def is_tag_span(line: str) -> bool:
 		"""<span???>xxx"""
-		return any(re.findall(r"<span.*?>[\"\w\.\-+\$]", line))
+		return "<span" in line and PATTERN_TAG_SPAN.search(line) is not None
 
 	@staticmethod
 	def is_tag_label(line: str) -> bool:
 		"""<label>xxx</label>"""
-		return any(re.findall(r"<label>[\w\-+]", line)) or any(
-			re.findall(r"\w</label>", line)
-		)
+		return "label>" in line and PATTERN_TAG_LABEL.search(line) is not None
 
 	@staticmethod
 	def is_tag_input(line: str) -> bool:
 		"""<input"""
-		return any(re.findall(r"<input.*?value=\"", line))
+		return "<input" in line and PATTERN_TAG_INPUT.search(line) is not None
 
 	@staticmethod
 	def is_tag_td(line: str) -> bool:
 		"""<td"""
-		return any(re.findall(r"<td data-label=", line))
+		return "<td data-label=" in line
 
 	@staticmethod
 	def is_widget_script(line: str) -> bool:
 		"""<<script"""
-		return any(re.findall(r"<<script", line))
+		return "<<script" in line
 
 	@staticmethod
 	def is_widget_note(line: str) -> bool:
 		"""<note"""
-		return any(re.findall(r"<<note\s\"", line))
+		return "<<note" in line and PATTERN_WIDGET_NOTE.search(line) is not None
 
 	@staticmethod
 	def is_widget_print(line: str) -> bool:
 		"""<<print xxx>>"""
-		return any(
-			re.findall(
-				r"<<(?:print|=|-)\s[^<]*[\"\'`\w]+[\-\?\s\w\.\$,\'\"<>\[\]\(\)/]+(?:\)>>|\">>|\'>>|`>>|\]>>|>>)",
-				line,
-			)
-		)
+		return "<<" in line and PATTERN_WIDGET_PRINT.search(line) is not None
 
 	@staticmethod
 	def is_widget_case(line: str) -> bool:
 		"""<<case xxx>>"""
-		return any(
-			re.findall(
-				r"<<(?:case|=|-)\s[^<]*[\"\'`\w]+[\-\?\s\w\.\$,\'\"<>\[\]\(\)/]+(?:\)>>|\">>|\'>>|`>>|\]>>|>>)",
-				line,
-			)
-		)
+		return "<<" in line and PATTERN_WIDGET_CASE.search(line) is not None
 
 	@staticmethod
 	def is_widget_textbox(line: str) -> bool:
 		"""<<textbox xxx>>"""
-		return any(re.findall(r"<<textbox\s\"", line))
+		return "<<textbox" in line and PATTERN_WIDGET_TEXTBOX.search(line) is not None
 
 	@staticmethod
 	def is_widget_number_stepper(line: str) -> bool:
 		"""<<numberStepper xxx>>"""
-		return any(re.findall(r"<<numberStepper\s\"", line))
+		return "<<numberStepper" in line and PATTERN_WIDGET_NUMBER_STEPPER.search(line) is not None
 
 	@staticmethod
 	def is_widget_if(line: str) -> bool:
 		"""<<if>>xxx</if>"""
-		return any(re.findall(r"<<if\s.*?>>\w", line))
+		return "<<if" in line and PATTERN_WIDGET_IF.search(line) is not None
 
 	@staticmethod
 	def is_widget_option(line: str) -> bool:
 		"""<<option"""
-		return any(re.findall(r"<<option\s\"", line))
+		return "<<option" in line and PATTERN_WIDGET_OPTION.search(line) is not None
 
 	@staticmethod
 	def is_widget_button(line: str) -> bool:
 		"""<<option"""
-		return any(re.findall(r"<<button ", line))
+		return "<<button " in line
 
 	@staticmethod
 	def is_widget_link(line: str) -> bool:
 		"""<<link [[xxx|yyy]]>>, <<link "xxx">>"""
-		return any(
-			# re.findall(r"<<link\s*(\[\[|\"\w|`\w|\'\w|\"\(|`\(|\'\(|_\w|`)", line)
-			re.findall(r"<<link\s*(\[\[|\"\w|`\w|\'\w|\"\(|`\(|\'\(|_\w|`|\w)", line)
-		)
+		return "<<link" in line and PATTERN_WIDGET_LINK.search(line) is not None
 
 	@staticmethod
 	def is_widget_actions_tentacle(line: str) -> bool:
 		"""逆天"""
 		return "<<actionstentacleadvcheckbox" in line
 
+	@staticmethod
+	def _is_only_marks_left(rest: str) -> bool:
+		"""去掉 <<>>, <>, $VAR 后剩下的是不是空的/注释/纯符号"""
+		rest = rest.strip()
+		return (
+			(not rest)
+			or ParseTextTwee.is_comment(rest)
+			or ParseTextTwee.is_only_marks(rest)
+		)
+
 	@staticmethod
 	def is_only_widgets(line: str) -> bool:
 		"""整行只有 <<>>, <>, $VAR"""
 		if "<" not in line and "$" not in line and not line.startswith("_"):
 			return False
 
-		"""特殊的半拉"""
-		if line in {
-			"<<print either(",
-			"<<= either(",
-			"<<- either(",
-			"<<print ["
-			"<<= ["
-			"<<- ["
-		}:
+		if line in ONLY_WIDGETS_HALF:
 			return True
 
-		widgets = {_ for _ in re.findall(r"(<<(?:[^<>]*?|run.*?|for.*?)>>)", line) if _}
-		for w in widgets:
-			# if "[[" not in w or ("[" in w and '"' not in w and "'" not in w and "`" not in w):
-			line = line.replace(w, "", -1)
-
+		# 每层一次 sub 扫完，下一层还有东西要去掉才继续
+		line = PATTERN_ONLY_WIDGETS_WIDGET.sub("", line)
 		if "<" not in line and "$" not in line and not line.startswith("_"):
-			return (
-				(not line.strip())
-				or ParseTextTwee.is_comment(line.strip())
-				or ParseTextTwee.is_only_marks(line.strip())
-				or False
-			)
-		tags = {_ for _ in re.findall(r"(<[/\s\w\"=\-@\$\+\'\.]*>)", line) if _}
-		for t in tags:
-			line = line.replace(t, "", -1)
+			return ParseTextTwee._is_only_marks_left(line)
 
+		line = PATTERN_ONLY_WIDGETS_TAG.sub("", line)
 		if "$" not in line and not line.startswith("_"):
-			return (
-				(not line.strip())
-				or ParseTextTwee.is_comment(line.strip())
-				or ParseTextTwee.is_only_marks(line.strip())
-				or False
-			)
+			return ParseTextTwee._is_only_marks_left(line)
 
-		vars_ = {
-			_ for _ in re.findall(r"((?:\$|_)[^_][#;\w\.\(\)\[\]\"\'`]*)", line) if _
-		}
-		for v in vars_:
-			line = line.replace(v, "", -1)
-		return (
-			(not line.strip())
-			or ParseTextTwee.is_comment(line.strip())
-			or ParseTextTwee.is_only_marks(line.strip())
-			or False
-		)
+		return ParseTextTwee._is_only_marks_left(PATTERN_ONLY_WIDGETS_VAR.sub("", line))
 
 
 class ParseTextJS:
@@ -2402,64 +2361,40 @@ class ParseTextJS:
 		self._filename = self._filepath.name  # 文件名
 		self._filedir = self._filepath.parent  # 文件夹
 
+		self._handler_name: str | None = None  # parse 实际用的抓取函数
+		self._elapsed: float = 0
+
 	def parse(self) -> list[bool]:
-		""""""
-		if DirNamesJS.CONFIG.value == self._filedir.name:
-			return self.parse_config()
-		elif DirNamesJS.SETUP.value == self._filedir.name:
-			return self.parse_setup()
-		elif DirNamesJS.HELPERS.value == self._filedir.name:
-			return self.parse_helpers()
-		elif DirNamesJS.JAVASCRIPT.value == self._filedir.name:
-			return self.parse_javascript()
-		elif DirNamesJS.VARIABLES.value == self._filedir.name:
-			return self.parse_variables()
-		elif DirNamesJS.SPECIAL_MASTURBATION.value == self._filedir.name:
-			return self.parse_masturbation()
-		elif DirNamesJS.PREGNANCY.value == self._filedir.name:
-			return self.parse_pregnancy()
-		elif DirNamesJS.TEMPLATES.value == self._filedir.name:
-			return self.parse_templates()
-		elif DirNamesJS.EXTERNAL.value == self._filedir.name:
-			return self.parse_external()
-		elif DirNamesJS.BASE_CLOTHING.value == self._filedir.name:
-			return self.parse_clothing()
-		elif DirNamesJS.BASE_SYSTEM.value == self._filedir.name:
-			return self.parse_system()
-		elif DirNamesJS.MAIN.value == self._filedir.name:
-			return self.parse_main()
-		elif DirNamesJS.RENDERER.value == self._filedir.name:
-			return self.parse_renderer()
-		elif DirNamesJS.LOC_FORESTSHOP.value == self._filedir.name:
-			return self.parse_loc_forestshop()
-		return self.parse_normal()
+		"""按目录和文件名找登记的抓取函数，没登记的按常规抓"""
+		handler = JS_PARSERS.resolve(self._filedir, self._filename) or ParseTextJS.parse_normal
+		self._handler_name = handler.__name__
+		start = time.perf_counter()
+		results = handler(self)
+		self._elapsed = time.perf_counter() - start
+		return results
 
-	"""01-config"""
-	def parse_config(self) -> list[bool]:
-		if FileNamesJS.SUGARCUBE_CONFIG_FULL.value == self._filename:
-			return self._parse_sugarcube_config()
-		return self.parse_normal()
+	@property
+	def handler_name(self) -> str | None:
+		"""实际用的抓取函数名"""
+		return self._handler_name
+
+	@property
+	def elapsed(self) -> float:
+		"""parse 的耗时 (秒)"""
+		return self._elapsed
 
+	"""01-config"""
+	@JS_PARSERS.register(DirNamesJS.CONFIG, FileNamesJS.SUGARCUBE_CONFIG_FULL)
 	def _parse_sugarcube_config(self) -> list[bool]:
 		return self.parse_type_only({"versionName:", "<a"})
 
 	"""01-setup"""
-	def parse_setup(self) -> list[bool]:
-		"""01-setup"""
-		if FileNamesJS.WEATHER_DESCRIPTION_FULL.value == self._filename:
-			return self._parse_weather_description()
-		return self.parse_normal()
-
+	@JS_PARSERS.register(DirNamesJS.SETUP, FileNamesJS.WEATHER_DESCRIPTION_FULL)
 	def _parse_weather_description(self):
 		return self.parse_type_only({"'", '"', "`"})
 
 	"""02-Helpers"""
-	def parse_helpers(self) -> list[bool]:
-		"""02-Helpers"""
-		if FileNamesJS.MACROS_FULL.value == self._filename:
-			return self._parse_macros()
-		return self.parse_normal()
-
+	@JS_PARSERS.register(DirNamesJS.HELPERS, FileNamesJS.MACROS_FULL)
 	def _parse_macros(self):
 		return self.parse_type_only({
 			"return `",
@@ -2469,40 +2404,7 @@ class ParseTextJS:
 		})
 
 	""" 03-JavaScript """
-	def parse_javascript(self) -> list[bool]:
-		"""03-JavaScript"""
-		if FileNamesJS.BEDROOM_PILLS_FULL.value == self._filename:
-			return self._parse_bedroom_pills()
-		elif FileNamesJS.BASE_FULL.value == self._filename:
-			return self._parse_base()
-		elif FileNamesJS.DEBUG_MENU_FULL.value == self._filename:
-			return self._parse_debug_menu()
-		elif FileNamesJS.FURNITURE_FULL.value == self._filename:
-			return self._parse_furniture()
-		elif FileNamesJS.EYES_RELATED.value == self._filename:
-			return self._parse_eyes_related()
-		elif FileNamesJS.SEXSHOP_MENU_FULL.value == self._filename:
-			return self._parse_sexshop_menu()
-		elif FileNamesJS.SEXTOY_INVENTORY_FULL.value == self._filename:
-			return self._parse_sextoy_inventory()
-		elif FileNamesJS.INGAME_FULL.value == self._filename:
-			return self._parse_ingame()
-		elif FileNamesJS.UI_FULL.value == self._filename:
-			return self._parse_ui()
-		elif FileNamesJS.NPC_COMPRESSOR_FULL.value == self._filename:
-			return self._parse_npc_compressor()
-		elif FileNamesJS.COLOUR_NAMER_FULL.value == self._filename:
-			return self._parse_colour_namer()
-		elif FileNamesJS.CLOTHING_SHOP_V2_FULL.value == self._filename:
-			return self._parse_clothing_shop_v2()
-		elif FileNamesJS.TIME_FULL.value == self._filename:
-			return self._parse_time()
-		elif FileNamesJS.TIME_MACROS_FULL.value == self._filename:
-			return self._parse_time_macros()
-		elif FileNamesJS.SAVE_FULL.value == self._filename:
-			return self._parse_save()
-		return self.parse_normal()
-
+	@JS_PARSERS.register(DirNamesJS.JAVASCRIPT, FileNamesJS.BEDROOM_PILLS_FULL)
 	def _parse_bedroom_pills(self):
 		"""..."""
 		results = []
@@ -2555,6 +2457,7 @@ class ParseTextJS:
 
 		return results
 
+	@JS_PARSERS.register(DirNamesJS.JAVASCRIPT, FileNamesJS.BASE_FULL)
 	def _parse_base(self):
 		"""T.text_output"""
 		results = []
@@ -2578,6 +2481,7 @@ class ParseTextJS:
 				results.append(False)
 		return results
 
+	@JS_PARSERS.register(DirNamesJS.JAVASCRIPT, FileNamesJS.DEBUG_MENU_FULL)
 	def _parse_debug_menu(self):
 		"""..."""
 		results = []
@@ -2622,14 +2526,17 @@ class ParseTextJS:
 
 		return results
 
+	@JS_PARSERS.register(DirNamesJS.JAVASCRIPT, FileNamesJS.EYES_RELATED)
 	def _parse_eyes_related(self):
 		"""怪东西"""
 		return self.parse_type_only({"sentence += ", '"."'})
 
+	@JS_PARSERS.register(DirNamesJS.JAVASCRIPT, FileNamesJS.FURNITURE_FULL)
 	def _parse_furniture(self):
 		"""json"""
 		return self.parse_type_only({"nameCap: ", "description: "})
 
+	@JS_PARSERS.register(DirNamesJS.JAVASCRIPT, FileNamesJS.SEXSHOP_MENU_FULL)
 	def _parse_sexshop_menu(self):
 		"""json"""
 		results = []
@@ -2659,6 +2566,7 @@ class ParseTextJS:
 
 		return results
 
+	@JS_PARSERS.register(DirNamesJS.JAVASCRIPT, FileNamesJS.SEXTOY_INVENTORY_FULL)
 	def _parse_sextoy_inventory(self):
 		"""零碎东西"""
 		results = []
@@ -2767,6 +2675,7 @@ class ParseTextJS:
 	#
 	#     return results
 
+	@JS_PARSERS.register(DirNamesJS.JAVASCRIPT, FileNamesJS.INGAME_FULL)
 	def _parse_ingame(self):
 		"""序数词词缀"""
 		_parse_type_only = self.parse_type_only({
@@ -2793,6 +2702,7 @@ class ParseTextJS:
 
 		return [bool(_1 or _2) for _1, _2 in zip(_parse_type_only, _parse_type_between)]
 
+	@JS_PARSERS.register(DirNamesJS.JAVASCRIPT, FileNamesJS.UI_FULL)
 	def _parse_ui(self):
 		"""text"""
 		results = []
@@ -2835,6 +2745,7 @@ class ParseTextJS:
 
 		return results
 
+	@JS_PARSERS.register(DirNamesJS.JAVASCRIPT, FileNamesJS.NPC_COMPRESSOR_FULL)
 	def _parse_npc_compressor(self):
 		results = []
 		multiconst_flag = False
@@ -2876,6 +2787,7 @@ class ParseTextJS:
 				results.append(False)
 		return results
 
+	@JS_PARSERS.register(DirNamesJS.JAVASCRIPT, FileNamesJS.COLOUR_NAMER_FULL)
 	def _parse_colour_namer(self):
 		results = []
 		for line in self._lines:
@@ -2898,6 +2810,7 @@ class ParseTextJS:
 				results.append(False)
 		return results
 
+	@JS_PARSERS.register(DirNamesJS.JAVASCRIPT, FileNamesJS.CLOTHING_SHOP_V2_FULL)
 	def _parse_clothing_shop_v2(self):
 		return self.parse_type_only(
 			{
@@ -2908,6 +2821,7 @@ class ParseTextJS:
 			}
 		)
 
+	@JS_PARSERS.register(DirNamesJS.JAVASCRIPT, FileNamesJS.TIME_FULL)
 	def _parse_time(self):
 		"""只有月份和星期"""
 		return self.parse_type_only({
@@ -2918,6 +2832,7 @@ class ParseTextJS:
 			"ordinalSuffixOf"
 		})
 
+	@JS_PARSERS.register(DirNamesJS.JAVASCRIPT, FileNamesJS.TIME_MACROS_FULL)
 	def _parse_time_macros(self):
 		"""只有几句话，byd越来越多了"""
 		return self.parse_type_only(
@@ -2930,6 +2845,7 @@ class ParseTextJS:
 			}
 		)
 
+	@JS_PARSERS.register(DirNamesJS.JAVASCRIPT, FileNamesJS.SAVE_FULL)
 	def _parse_save(self):
 		"""save.js"""
 		results = []
@@ -2981,18 +2897,7 @@ class ParseTextJS:
 
 	""" 04-variables """
 
-	def parse_variables(self) -> list[bool]:
-		"""04-variables"""
-		if FileNamesJS.FEATS_FULL.value == self._filename:
-			return self._parse_feats()
-		elif FileNamesJS.COLOURS_FULL.value == self._filename:
-			return self._parse_colours()
-		elif FileNamesJS.SHOP_FULL.value == self._filename:
-			return self._parse_shop()
-		elif FileNamesJS.PLANT_SETUP_FULL.value == self._filename:
-			return self._parse_plant_setup()
-		return self.parse_normal()
-
+	@JS_PARSERS.register(DirNamesJS.VARIABLES, FileNamesJS.FEATS_FULL)
 	def _parse_feats(self):
 		"""json"""
 		return self.parse_type_only(
@@ -3002,30 +2907,24 @@ class ParseTextJS:
 			}
 		)
 
+	@JS_PARSERS.register(DirNamesJS.VARIABLES, FileNamesJS.COLOURS_FULL)
 	def _parse_colours(self):
 		"""json"""
 		return self.parse_type_only({'name_cap: "', 'name: "'})
 
+	@JS_PARSERS.register(DirNamesJS.VARIABLES, FileNamesJS.SHOP_FULL)
 	def _parse_shop(self):
 		"""json"""
 		return self.parse_type_only('"')
 
+	@JS_PARSERS.register(DirNamesJS.VARIABLES, FileNamesJS.PLANT_SETUP_FULL)
 	def _parse_plant_setup(self):
 		"""json"""
 		return self.parse_type_only({"plural:", "singular:", "seed_name:", "ingredients:", "type:"})
 
 	""" special-masturbation """
 
-	def parse_masturbation(self) -> list[bool]:
-		"""special-masturbation"""
-		if FileNamesJS.ACTIONS_FULL.value == self._filename:
-			return self._parse_actions()
-		elif FileNamesJS.EFFECTS_FULL.value == self._filename:
-			return self._parse_effects()
-		elif FileNamesJS.MACROS_MASTURBATION_FULL.value == self._filename:
-			return self._parse_macros_masturbation()
-		return self.parse_normal()
-
+	@JS_PARSERS.register(DirNamesJS.SPECIAL_MASTURBATION, FileNamesJS.ACTIONS_FULL)
 	def _parse_actions(self):
 		"""result.text"""
 		results = []
@@ -3087,6 +2986,7 @@ class ParseTextJS:
 				results.append(False)
 		return results
 
+	@JS_PARSERS.register(DirNamesJS.SPECIAL_MASTURBATION, FileNamesJS.EFFECTS_FULL)
 	def _parse_effects(self):
 		results = []
 		append_fragment_flag = False
@@ -3164,27 +3064,18 @@ class ParseTextJS:
 				results.append(False)
 		return results
 
+	@JS_PARSERS.register(DirNamesJS.SPECIAL_MASTURBATION, FileNamesJS.MACROS_MASTURBATION_FULL)
 	def _parse_macros_masturbation(self):
 		return self.parse_type_only({"namecap", "name : name"})
 
 	""" 04-pregnancy """
 
-	def parse_pregnancy(self) -> list[bool]:
-		"""04-pregnancy"""
-		if FileNamesJS.CHILDREN_STORY_FUNCTIONS_FULL.value == self._filename:
-			return self._parse_children_story_functions()
-		elif FileNamesJS.PREGNANCY_FULL.value == self._filename:
-			return self._parse_pregnancy()
-		elif FileNamesJS.STORY_FUNCTIONS_FULL.value == self._filename:
-			return self._parse_story_functions()
-		elif FileNamesJS.PREGNANCY_TYPES_FULL.value == self._filename:
-			return self._parse_pregnancy_types()
-		return self.parse_normal()
-
+	@JS_PARSERS.register(DirNamesJS.PREGNANCY, FileNamesJS.CHILDREN_STORY_FUNCTIONS_FULL)
 	def _parse_children_story_functions(self):
 		"""就一个 wordList"""
 		return self.parse_type_only({"const wordList", "wordList.push"})
 
+	@JS_PARSERS.register(DirNamesJS.PREGNANCY, FileNamesJS.PREGNANCY_FULL)
 	def _parse_pregnancy(self):
 		return self.parse_type_only(
 			{
@@ -3196,11 +3087,13 @@ class ParseTextJS:
 			}
 		)
 
+	@JS_PARSERS.register(DirNamesJS.PREGNANCY, FileNamesJS.STORY_FUNCTIONS_FULL)
 	def _parse_story_functions(self):
 		return self.parse_type_only(
 			{"name = (caps ?", "name = caps ?", "name = name[0]"}
 		)
 
+	@JS_PARSERS.register(DirNamesJS.PREGNANCY, FileNamesJS.PREGNANCY_TYPES_FULL)
 	def _parse_pregnancy_types(self):
 		return self.parse_type_only(
 			{
@@ -3214,15 +3107,7 @@ class ParseTextJS:
 
 	""" 03-Templates """
 
-	def parse_templates(self) -> list[bool]:
-		if FileNamesJS.T_MISC_FULL.value == self._filename:
-			return self._parse_t_misc()
-		elif FileNamesJS.T_ACTIONS_FULL.value == self._filename:
-			return self._parse_t_actions()
-		elif FileNamesJS.T_BODYPARTS_FULL.value == self._filename:
-			return self._parse_t_bodyparts()
-		return self.parse_normal()
-
+	@JS_PARSERS.register(DirNamesJS.TEMPLATES, FileNamesJS.T_MISC_FULL)
 	def _parse_t_misc(self):
 		"""t-misc"""
 		results = []
@@ -3252,33 +3137,25 @@ class ParseTextJS:
 				results.append(False)
 		return results
 
+	@JS_PARSERS.register(DirNamesJS.TEMPLATES, FileNamesJS.T_ACTIONS_FULL)
 	def _parse_t_actions(self):
 		"""t-actions"""
 		return self.parse_type_only("either(")
 
+	@JS_PARSERS.register(DirNamesJS.TEMPLATES, FileNamesJS.T_BODYPARTS_FULL)
 	def _parse_t_bodyparts(self):
 		"""t-actions"""
 		return self.parse_type_only("either(")
 
 	""" external """
 
-	def parse_external(self) -> list[bool]:
-		if FileNamesJS.COLOR_NAMER_FULL.value == self._filename:
-			return self._parse_color_namer()
-		return self.parse_normal()
-
+	@JS_PARSERS.register(DirNamesJS.EXTERNAL, FileNamesJS.COLOR_NAMER_FULL)
 	def _parse_color_namer(self):
 		return self.parse_type_between(starts=["var colors = {"], ends=["}"])
 
 	""" base-clothing """
 
-	def parse_clothing(self):
-		if FileNamesJS.UDPATE_CLOTHES_FULL.value == self._filename:
-			return self._parse_update_clothes()
-		elif FileNamesJS.CLOTHING.value in self._filename:
-			return self._parse_clothing()
-		return self.parse_normal()
-
+	@JS_PARSERS.register(DirNamesJS.BASE_CLOTHING, FileNamesJS.UDPATE_CLOTHES_FULL)
 	def _parse_update_clothes(self):
 		results = []
 		for line in self._lines:
@@ -3295,6 +3172,7 @@ class ParseTextJS:
 				results.append(False)
 		return results
 
+	@JS_PARSERS.register(DirNamesJS.BASE_CLOTHING, FileNamesJS.CLOTHING, fragment=True)
 	def _parse_clothing(self):
 		"""0.4.2.3 改动"""
 		_type_only = self.parse_type_only({
@@ -3321,19 +3199,7 @@ class ParseTextJS:
 
 	""" base-system """
 
-	def parse_system(self):
-		if FileNamesJS.WIDGETS_FULL.value == self._filename:
-			return self._parse_widgets()
-		elif FileNamesJS.TEXT_FULL.value == self._filename:
-			return self._parse_text()
-		elif FileNamesJS.EFFECT_FULL.value == self._filename:
-			return self._parse_effect()
-		elif FileNamesJS.STAT_CHANGES_FULL.value == self._filename:
-			return self._parse_stat_changes()
-		elif FileNamesJS.QUESTMARKERS_FULL.value == self._filename:
-			return self._parse_questmarker()
-		return self.parse_normal()
-
+	@JS_PARSERS.register(DirNamesJS.BASE_SYSTEM, FileNamesJS.WIDGETS_FULL)
 	def _parse_widgets(self):
 		return self.parse_type_only(
 			{
@@ -3344,6 +3210,7 @@ class ParseTextJS:
 			}
 		)
 
+	@JS_PARSERS.register(DirNamesJS.BASE_SYSTEM, FileNamesJS.TEXT_FULL)
 	def _parse_text(self):
 		return self.parse_type_only({
 			".statChange",
@@ -3353,6 +3220,7 @@ class ParseTextJS:
 			"'"
 		})
 
+	@JS_PARSERS.register(DirNamesJS.BASE_SYSTEM, FileNamesJS.EFFECT_FULL)
 	def _parse_effect(self):
 		results = []
 		multi_element_flag = False
@@ -3398,9 +3266,11 @@ class ParseTextJS:
 
 		return results
 
+	@JS_PARSERS.register(DirNamesJS.BASE_SYSTEM, FileNamesJS.STAT_CHANGES_FULL)
 	def _parse_stat_changes(self):
 		return self.parse_type_only({"return '", 'return "', ".statChange"})
 
+	@JS_PARSERS.register(DirNamesJS.BASE_SYSTEM, FileNamesJS.QUESTMARKERS_FULL)
 	def _parse_questmarker(self) -> list[bool]:
 		results = []
 		for line in self._lines:
@@ -3425,22 +3295,14 @@ class ParseTextJS:
 		return results
 
 	""" 01-main """
-	def parse_main(self):
-		if FileNamesJS.TOOLTIPS.value == self._filename:
-			return self._parse_tooltips()
-		return self.parse_normal()
-
+	@JS_PARSERS.register(DirNamesJS.MAIN, FileNamesJS.TOOLTIPS)
 	def _parse_tooltips(self):
 		return self.parse_type_only({
 			'"', '`', "Description", "Output", "<span", "<br>"
 		})
 
 	""" 05-renderer """
-	def parse_renderer(self):
-		if FileNamesJS.CANVASMODEL_EDITOR_FULL.value == self._filename:
-			return self._parse_canvasmodel_editor()
-		return self.parse_normal()
-
+	@JS_PARSERS.register(DirNamesJS.RENDERER, FileNamesJS.CANVASMODEL_EDITOR_FULL)
 	def _parse_canvasmodel_editor(self):
 		return self.parse_type_only({
 			'CombatEditor.create',
@@ -3449,11 +3311,7 @@ class ParseTextJS:
 		})
 
 	""" loc-forestshop """
-	def parse_loc_forestshop(self):
-		if FileNamesJS.SHOP_HUNT_FUNCTIONS_FULL.value == self._filename:
-			return self._parse_shop_hunt_functions()
-		return self.parse_normal()
-
+	@JS_PARSERS.register(DirNamesJS.LOC_FORESTSHOP, FileNamesJS.SHOP_HUNT_FUNCTIONS_FULL)
 	def _parse_shop_hunt_functions(self):
 		return self.parse_type_between(
 			starts=["function shopHuntLocName(loc, ...args) {"],
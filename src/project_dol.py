@@ -1,20 +1,26 @@
 import contextlib
 import csv
 import datetime
+import hashlib
 import re
 import os
 import platform
-from .ast_javascript import Acorn, JSSyntaxError
+from .ast_javascript import DIR_ARCON_ROOT, Acorn, AcornPool, JSSyntaxError
+from collections import deque
+from dataclasses import asdict
 from typing import Any
 from urllib.parse import quote
 from zipfile import ZipFile as zf, ZIP_DEFLATED
 from aiofiles import open as aopen
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing.util import Finalize
 from pathlib import Path
 
 import asyncio
 import json
 import httpx
 import shutil
+import tempfile
 import subprocess
 import time
 import webbrowser
@@ -23,14 +29,30 @@ import stat
 from .consts import *
 from .log import logger
 from .parse_text import *
-# from .download import *
+from .source import GameSource, LineRecord, build_line_table
+from .translation_memory import TranslationMemory
+from .lint import LintEngine, LintRule
+from .i18n_bundle import I18nBundleWriter
+from .tools.process_variables import VariablesProcess
+from .client import shared_client
+from .download import chunk_download
 
 LOGGER_COLOR = logger.opt(colors=True)
+# 覆写时只提示这几种，其余的交给单独的检查
+APPLY_LINT_RULES = (LintRule.LACK_ANGLE, LintRule.DIFFERENT_EVENT)
+# 生成、更新的词典 csv 统一用 \n 换行，没改动而跳过重写的文件和重写过的一致
+DICT_CSV_LINETERMINATOR = "\n"
+
+_WORKER_SOURCE: GameSource | None = None  # 进程池里每个进程一份，压缩包只打开一次
 
 
 class ProjectDOL:
 	"""本地化主类"""
-	def __init__(self, type_: str = "common"):
+	def __init__(self, type_: str = "common", client: httpx.AsyncClient = None):
+		"""
+		:param client: 整个流程共用的客户端，不传则每次请求临时建一个
+		"""
+		self._client = client
 		with open(DIR_JSON_ROOT / "blacklists.json", "r", encoding="utf-8") as fp:
 			self._blacklists: dict[str, list] = json.load(fp)
 
@@ -41,7 +63,9 @@ class ProjectDOL:
 		self._version: str = None
 		self._mention_name = "" if self._type == "common" else "dev"
 		self._commit: dict[str, Any] = None
-		self._acorn = Acorn()
+		self._acorn: Acorn = None  # 用到时才建，建好后常驻
+		self._lint = LintEngine()
+		self._unzip_rest_task: asyncio.Task = None
 		if FILE_COMMITS.exists():
 			with open(FILE_COMMITS, "r", encoding="utf-8") as fp:
 				self._commit: dict[str, Any] = json.load(fp)
@@ -58,7 +82,7 @@ class ProjectDOL:
 
 	""" 获取最新版本 """
 	async def fetch_latest_version(self, is_quiet: bool = True):
-		async with httpx.AsyncClient(verify=False) as client:
+		async with shared_client(self._client) as client:
 			if self._type == "common":
 				url = f"{REPOSITORY_URL_COMMON}/-/raw/master/version"
 			else:
@@ -70,8 +94,11 @@ class ProjectDOL:
 		self._init_dirs(self._version)
 
 	""" 下载源码 """
-	async def download_from_gitgud(self):
-		"""从 gitgud 下载源仓库文件"""
+	async def download_from_gitgud(self, extract: bool = True) -> bool:
+		"""
+		从 gitgud 下载源仓库文件
+		:param extract: False 则不解压，之后用 game_source(from_zip=True) 直接从压缩包里读
+		"""
 		if not self._version:
 			await self.fetch_latest_version()
 		if self._is_latest:  # 下载慢，是最新就不要重复下载了
@@ -79,51 +106,122 @@ class ProjectDOL:
 			if dol_path_zip.exists():
 				with contextlib.suppress(shutil.Error, FileNotFoundError):
 					shutil.move(dol_path_zip, DIR_TEMP_ROOT)
-				await self.unzip_latest_repository()
-				return
-		await self.fetch_latest_repository()
-		await self.unzip_latest_repository()
+				if extract:
+					await self.unzip_latest_repository()
+				return True
+		if not await self.fetch_latest_repository():
+			return False
+		if extract:
+			await self.unzip_latest_repository()
+		return True
 
-	async def fetch_latest_repository(self):
-		"""获取最新仓库内容"""
+	def game_source(self, from_zip: bool = False) -> GameSource:
+		"""
+		游戏源码的读取入口
+		:param from_zip: 直接从下载的压缩包里读，不用解压
+		"""
+		if from_zip:
+			return GameSource(self.game_dir, DIR_TEMP_ROOT / f"dol{self._mention_name}.zip")
+		return GameSource(self.game_dir)
+
+	async def fetch_latest_repository(self) -> bool:
+		"""获取最新仓库内容，支持 Range 就切片并发下载，否则边下边写盘、断了续传"""
 		logger.info(f"===== 开始获取最新{self._mention_name}仓库内容 ...")
-		async with httpx.AsyncClient(verify=False) as client:
-			if self._type == "common":
-				zip_url = REPOSITORY_ZIP_URL_COMMON
-			else:
-				zip_url = REPOSITORY_ZIP_URL_DEV
-		# FIXME 神经 GitGud，不知道在搞什么
-		# 	flag = False
-		# 	for _ in range(3):
-		# 		try:
-		# 			response = await client.head(zip_url, timeout=60, follow_redirects=True)
-		# 			filesize = int(response.headers["Content-Length"])
-		# 			chunks = await chunk_split(filesize, 64)
-		# 		except (httpx.ConnectError, KeyError) as e:
-		# 			continue
-		# 		else:
-		# 			flag = True
-		# 			break
-		#
-		# 	if not flag:
-		# 		logger.error("***** 无法正常下载最新仓库源码！请检查你的网络连接是否正常！")
-		# 	tasks = [
-		# 		chunk_download(zip_url, client, start, end, idx, len(chunks), DIR_TEMP_ROOT / f"dol{self._mention_name}.zip")
-		# 		for idx, (start, end) in enumerate(chunks)
-		# 	]
-		# 	await asyncio.gather(*tasks)
-			save_path: Path = DIR_TEMP_ROOT / f"dol{self._mention_name}.zip"
-			response = await client.get(zip_url, timeout=60, follow_redirects=True)
-			async with aopen(save_path, "wb") as fp:
-				await fp.write(response.content)
+		if self._type == "common":
+			zip_url = REPOSITORY_ZIP_URL_COMMON
+		else:
+			zip_url = REPOSITORY_ZIP_URL_DEV
+		save_path: Path = DIR_TEMP_ROOT / f"dol{self._mention_name}.zip"
+		async with shared_client(self._client) as client:
+			if not await chunk_download(zip_url, save_path, client):
+				logger.error("***** 无法正常下载最新仓库源码！请检查你的网络连接是否正常！\n")
+				return False
 		logger.info(f"##### 最新{self._mention_name}仓库内容已获取! \n")
+		return True
 
 	async def unzip_latest_repository(self):
-		"""解压到本地"""
+		"""
+		解压到本地，多线程
+		先解压游戏文本和编译要用的，图片等其余的放到后台解压，改图片/编译前 wait_for_unzip
+		只建字典不编译时用 download_from_gitgud(extract=False) 直接从压缩包里读
+		"""
 		logger.info(f"===== 开始解压{self._mention_name}最新仓库内容 ...")
-		with zf(DIR_TEMP_ROOT / f"dol{self._mention_name}.zip") as zfp:
-			zfp.extractall(DIR_ROOT)
-		logger.info(f"##### 最新{self._mention_name}仓库内容已解压! \n")
+		zip_path = DIR_TEMP_ROOT / f"dol{self._mention_name}.zip"
+		with zf(zip_path) as zfp:
+			names = zfp.namelist()
+		essentials = [name for name in names if self._is_essential_member(name)]
+		essential_set = set(essentials)
+		rest = [name for name in names if name not in essential_set]
+
+		await asyncio.to_thread(self._extract_members, zip_path, essentials, DIR_ROOT)
+		logger.info(f"##### 最新{self._mention_name}仓库内容已解压 {len(essentials)} / {len(names)} 个! \n")
+		if rest:
+			self._unzip_rest_task = asyncio.create_task(
+				asyncio.to_thread(self._extract_members, zip_path, rest, DIR_ROOT)
+			)
+
+	async def wait_for_unzip(self):
+		"""等后台解压完剩下的文件"""
+		if self._unzip_rest_task is None:
+			return
+		await self._unzip_rest_task
+		self._unzip_rest_task = None
+		logger.info(f"##### 最新{self._mention_name}仓库其余内容已解压! \n")
+
+	@staticmethod
+	def _member_relpath(name: str) -> str:
+		"""压缩包里的路径去掉最外层的 degrees-of-lewdity-master/"""
+		return name.split("/", 1)[1] if "/" in name else ""
+
+	def _is_text_member(self, name: str) -> bool:
+		"""抓取要用的文本：所有 twee (预处理 <<set>>/<<run>> 要扫描全部 twee，不能按黑名单筛) 和白名单里的 js"""
+		relpath = self._member_relpath(name)
+		if not relpath.startswith("game/") or name.endswith("/"):
+			return False
+		dir_name, _, file = relpath.rpartition("/")
+		dir_name = dir_name.rpartition("/")[2]
+		if file.endswith(SUFFIX_TWEE):
+			return True
+		return file.endswith(SUFFIX_JS) and file in self._whitelists.get(dir_name, [])
+
+	def _is_essential_member(self, name: str) -> bool:
+		"""游戏文本和编译要用的：game/, modules/, devTools/tweego/ 和根目录的文件，黑名单里的放到后台解压"""
+		# 预处理 <<set>>/<<run>> 要扫描全部 twee，黑名单里的 twee 也得先解压
+		if self._is_text_member(name):
+			return True
+		relpath = self._member_relpath(name)
+		if "/" not in relpath:
+			return True
+		if not relpath.startswith(("game/", "modules/", "devTools/tweego/")):
+			return False
+		dir_name, _, file = relpath.rpartition("/")
+		return not self._is_blacklisted(dir_name.rpartition("/")[2], file)
+
+	def _is_blacklisted(self, dir_name: str, file: str) -> bool:
+		"""黑名单里目录对应空列表为整个目录都不要，否则只不要列出的文件"""
+		if dir_name not in self._blacklists:
+			return False
+		return not self._blacklists[dir_name] or file in self._blacklists[dir_name]
+
+	@staticmethod
+	def _extract_members(zip_path: Path, members: list[str], target: Path, workers: int = 0):
+		"""分给几个线程解压，每个线程自己开一个 ZipFile，解压缩时不占 GIL"""
+		# ZipFile.extract 建上级目录时不带 exist_ok，几个线程同时建同一个目录会报 FileExistsError
+		# 所以目录先在这里一次建好，目录条目本身不再分给线程
+		for directory in {(target / name).parent for name in members} | {target / name for name in members if name.endswith("/")}:
+			os.makedirs(directory, exist_ok=True)
+		members = [name for name in members if not name.endswith("/")]
+
+		workers = workers or min(8, os.cpu_count() or 1)
+		slices = [members[idx::workers] for idx in range(workers)]
+
+		def extract(names: list[str]):
+			with zf(zip_path) as zfp:
+				for name in names:
+					zfp.extract(name, target)
+
+		with ThreadPoolExecutor(max_workers=workers) as executor:
+			list(executor.map(extract, slices))
 
 	async def patch_format_js(self):
 		"""汉化 format.js"""
@@ -135,40 +233,35 @@ class ProjectDOL:
 		logger.info(f"##### format.js 已替换！\n")
 
 	""" 创建生肉词典 """
-	async def create_dicts(self):
-		"""创建字典"""
-		await self._fetch_all_text_files()
+	async def create_dicts(self, workers: int = PROCESS_WORKERS, set_run_index: dict[Path, list[str]] = None, incremental: bool = True, source: GameSource = None):
+		"""
+		创建字典
+		:param workers: 进程池大小，0 为 cpu 核数，1 为不开进程池
+		:param set_run_index: 所有 <<set>>/<<run>> 的路径索引，不传则在这里生成
+		:param incremental: 内容没变的文件直接用上次抓取的结果，不再重新解析
+		:param source: 游戏源码，不传则读解压出来的目录
+		"""
+		source = source or self.game_source()
+		if set_run_index is None:
+			set_run_index = VariablesProcess(source).fetch_set_run_index()
+		await self._fetch_all_text_files(source)
 		await self._create_all_text_files_dir()
-		await self._process_texts()
+		await self._process_texts(set_run_index, source, workers, incremental)
 
-	async def _fetch_all_text_files(self):
+	async def _fetch_all_text_files(self, source: GameSource):
 		"""获取所有文本文件"""
 		logger.info(f"===== 开始获取{self._mention_name}所有文本文件位置 ...")
 		self._game_texts_file_lists = []
-		if self._type == "common":
-			texts_dir = DIR_GAME_TEXTS_COMMON
-		else:
-			texts_dir = DIR_GAME_TEXTS_DEV
-		for root, dir_list, file_list in os.walk(texts_dir):
-			dir_name = Path(root).absolute().name
-			for file in file_list:
-				if not file.endswith(SUFFIX_TWEE):
-					if not file.endswith(SUFFIX_JS):
-						continue
-
-					if dir_name in self._whitelists and file in self._whitelists[dir_name]:
-						self._game_texts_file_lists.append(Path(root).absolute() / file)
-					continue
+		for filepath in source.iter_files("game", (SUFFIX_TWEE, SUFFIX_JS)):
+			dir_name = filepath.parent.name
+			file = filepath.name
+			if not file.endswith(SUFFIX_TWEE):
+				if dir_name in self._whitelists and file in self._whitelists[dir_name]:
+					self._game_texts_file_lists.append(filepath)
+				continue
 
-				if dir_name not in self._blacklists:
-					self._game_texts_file_lists.append(Path(root).absolute() / file)
-				elif (
-					not self._blacklists[dir_name]
-					or file in self._blacklists[dir_name]
-				):
-					continue
-				else:
-					self._game_texts_file_lists.append(Path(root).absolute() / file)
+			if not self._is_blacklisted(dir_name, file):
+				self._game_texts_file_lists.append(filepath)
 
 		logger.info(f"##### {self._mention_name}所有文本文件位置已获取 !\n")
 
@@ -189,101 +282,184 @@ class ProjectDOL:
 			if not target_dir_json.exists():
 				os.makedirs(target_dir_json, exist_ok=True)
 
-	async def _process_texts(self):
+	async def _process_texts(self, set_run_index: dict[Path, list[str]], source: GameSource, workers: int = PROCESS_WORKERS, incremental: bool = True):
 		"""处理翻译文本为键值对"""
 		logger.info(f"===== 开始处理{self._mention_name}翻译文本为键值对 ...")
-		tasks = [
-			self._process_for_gather(idx, file)
-			for idx, file in enumerate(self._game_texts_file_lists)
+		manifest = self._load_extraction_manifest() if incremental else {}
+		keys = [
+			Path().joinpath(*file.parts[file.parts.index("game")+1:]).as_posix()
+			for file in self._game_texts_file_lists
 		]
-		await asyncio.gather(*tasks)
+		# 每个任务只传相对路径，GameSource 由 initializer 每个进程传一次
+		relpaths = [file.relative_to(source.root).as_posix() for file in self._game_texts_file_lists]
+		if workers == 1:
+			results = [
+				self._process_for_gather(relpath, self._version, self._type, set_run_index.get(file, []), manifest.get(key), source)
+				for file, relpath, key in zip(self._game_texts_file_lists, relpaths, keys)
+			]
+		else:
+			loop = asyncio.get_running_loop()
+			with ProcessPoolExecutor(max_workers=workers or None, initializer=self._init_process_worker, initargs=(source,)) as executor:
+				tasks = [
+					loop.run_in_executor(executor, self._process_for_gather, relpath, self._version, self._type, set_run_index.get(file, []), manifest.get(key))
+					for file, relpath, key in zip(self._game_texts_file_lists, relpaths, keys)
+				]
+				results = await asyncio.gather(*tasks)
+
+		reused = sum(
+			bool(result and manifest.get(key) and manifest[key]["hash"] == result["hash"])
+			for key, result in zip(keys, results)
+		)
+		logger.info(f"\t- 重新解析 {len(keys) - reused} / {len(keys)} 个文件")
+		for handler, count, elapsed in self._summarize_handlers([
+			result
+			for key, result in zip(keys, results)
+			if result and not (manifest.get(key) and manifest[key]["hash"] == result["hash"])
+		]):
+			logger.info(f"\t- {handler}: {count} 个文件, {elapsed:.2f}s")
+		self._dump_extraction_manifest({
+			key: result
+			for key, result in zip(keys, results)
+			if result is not None
+		})
 		logger.info(f"##### {self._mention_name}翻译文本已处理为键值对 ! \n")
 
-	async def _process_for_gather(self, idx: int, file: Path):
-		target_file = Path().joinpath(*file.parts[file.parts.index("game")+1:]).with_suffix("")
+	@staticmethod
+	def _summarize_handlers(extractions: list[dict], top: int = 5) -> list[tuple[str, int, float]]:
+		"""按抓取函数汇总文件数和 parse 耗时，只列耗时最多的几个"""
+		summary: dict[str, list] = {}
+		for extraction in extractions:
+			if not extraction.get("handler"):
+				continue
+			count_elapsed = summary.setdefault(extraction["handler"], [0, 0.0])
+			count_elapsed[0] += 1
+			count_elapsed[1] += extraction["elapsed"]
+		return sorted(
+			((handler, count, elapsed) for handler, (count, elapsed) in summary.items()),
+			key=lambda item: -item[2],
+		)[:top]
 
-		with open(file, "r", encoding="utf-8") as fp:
-			lines = fp.readlines()
-		with open(file, "r", encoding="utf-8") as fp:
-			content = fp.read()
-		if file.name.endswith(SUFFIX_TWEE):
-			pt = ParseTextTwee(lines, file)
-			pre_bool_list = pt.pre_parse_set_run()
-		elif file.name.endswith(SUFFIX_JS):
-			pt = ParseTextJS(lines, file)
+	@property
+	def _extraction_manifest_file(self) -> Path:
+		return DIR_CACHE_ROOT / f"extraction_{self._type}.json"
+
+	@staticmethod
+	def _parser_fingerprint() -> str:
+		"""抓取规则的哈希，规则改了就不能用旧的抓取结果"""
+		md5 = hashlib.md5()
+		for source in (
+			Path(__file__).parent / "parse_text.py",
+			Path(__file__).parent / "consts.py",  # DirNames / FileNames 分派规则
+			Path(__file__).parent / "tools" / "process_variables" / "main.py",
+			DIR_JSON_ROOT / "blacklists.json",
+		):
+			md5.update(source.read_bytes())
+		return md5.hexdigest()
+
+	def _load_extraction_manifest(self) -> dict[str, dict]:
+		"""上次抓取的结果：文件相对路径: {hash, able}"""
+		if not self._extraction_manifest_file.exists():
+			return {}
+		with open(self._extraction_manifest_file, "r", encoding="utf-8") as fp:
+			manifest: dict = json.load(fp)
+		if manifest.get("parser") != self._parser_fingerprint():
+			return {}
+		return manifest["files"]
+
+	def _dump_extraction_manifest(self, files: dict[str, dict]):
+		os.makedirs(DIR_CACHE_ROOT, exist_ok=True)
+		with open(self._extraction_manifest_file, "w", encoding="utf-8") as fp:
+			json.dump({"parser": self._parser_fingerprint(), "files": files}, fp, ensure_ascii=False)
+
+	@staticmethod
+	def _init_process_worker(source: GameSource):
+		"""进程池 initializer：记下这个进程读文件用的 GameSource，进程退出时关掉压缩包"""
+		global _WORKER_SOURCE
+		source.close()  # fork 出来的进程继承了父进程打开的压缩包，和父进程共用读取位置，得自己重新打开
+		_WORKER_SOURCE = source
+		Finalize(source, source.close, exitpriority=0)  # 进程池的子进程退出时不走 atexit
+
+	@staticmethod
+	def _process_for_gather(relpath: str, version: str, type_: str, set_run_lines: list[str], cached: dict = None, source: GameSource = None) -> dict | None:
+		"""
+		进程池用，只能用传进来的参数
+		:param relpath: 相对游戏根目录的路径，如 game/base-system/widgets.twee
+		:param cached: 上次抓取的结果 {hash, able}，文件内容没变就不再解析
+		:param source: 从这里读文件，目录或者压缩包都行，不传则用 initializer 记下的
+		:return: 本次抓取的结果，写进 manifest
+		"""
+		source = source or _WORKER_SOURCE
+		file = source.root / relpath
+		target_file = Path().joinpath(*file.parts[file.parts.index("game")+1:]).with_suffix("")
+		if file.name.endswith(SUFFIX_JS):
 			target_file = f"{target_file}.js"
+		elif not file.name.endswith(SUFFIX_TWEE):
+			return None
+
+		content, lines = source.read(file)
+		digest = hashlib.md5(content.encode("utf-8")).hexdigest()
+
+		if cached and cached["hash"] == digest:
+			able_idxes = set(cached["able"])
+			able_lines = [idx in able_idxes for idx in range(len(lines))]
+			handler, elapsed = cached.get("handler"), cached.get("elapsed", 0)
 		else:
-			return
-		able_lines = pt.parse()
-		if file.name.endswith(SUFFIX_TWEE) and pt.pre_bool_list:
-			able_lines = [
-				True if pre_bool_list[idx] or line else False
-				for idx, line in enumerate(able_lines)
-			]
+			if file.name.endswith(SUFFIX_TWEE):
+				pt = ParseTextTwee(lines, file, set_run_lines)
+				pre_bool_list = pt.pre_parse_set_run()
+			else:
+				pt = ParseTextJS(lines, file)
+			able_lines = pt.parse()
+			if file.name.endswith(SUFFIX_TWEE) and pt.pre_bool_list:
+				able_lines = [
+					True if pre_bool_list[idx] or line else False
+					for idx, line in enumerate(able_lines)
+				]
+			handler, elapsed = pt.handler_name, pt.elapsed
+		extraction = {
+			"hash": digest,
+			"able": [idx for idx, flag in enumerate(able_lines) if flag],
+			"handler": handler,  # 用的哪个抓取函数
+			"elapsed": round(elapsed, 6),  # 实际解析那次 parse 的耗时 (秒)
+		}
 
 		if not any(able_lines):
 			logger.warning(f"\t- ***** 文件 {file} 无有效翻译行 !")
-			return
+			return extraction
 		try:
-			results_lines_csv = [
-				(f"{idx_ + 1}_{'_'.join(self._version[2:].split('.'))}|", _.strip())
-				for idx_, _ in enumerate(lines)
-				if able_lines[idx_]
-			]
-			results_lines_json = await self._build_json_results_with_passage(lines, able_lines, content, file.__str__().split("\\game\\")[-1].split("/game/")[-1])
+			table = build_line_table(lines)
+			results_lines_json = ProjectDOL._build_json_results_with_passage(table, able_lines, file.__str__().split("\\game\\")[-1].split("/game/")[-1], version)
+			results_lines_csv = [(_["key"], _["original"]) for _ in results_lines_json]
 		except IndexError:
 			logger.error(f"lines: {len(lines)} - parsed: {len(able_lines)}| {file}")
-			results_lines_csv = None
-			results_lines_json = None
+			return None
 		if results_lines_csv:
-			with open(DIR_RAW_DICTS / self._type / self._version / "csv" / "game" / f"{target_file}.csv", "w", encoding="utf-8-sig", newline="") as fp:
-				csv.writer(fp).writerows(results_lines_csv)
+			with open(DIR_RAW_DICTS / type_ / version / "csv" / "game" / f"{target_file}.csv", "w", encoding="utf-8-sig", newline="") as fp:
+				csv.writer(fp, lineterminator=DICT_CSV_LINETERMINATOR).writerows(results_lines_csv)
 		if results_lines_json:
-			with open(DIR_RAW_DICTS / self._type / self._version / "json" / "game" / f"{target_file}.json", "w", encoding="utf-8", newline="") as fp:
+			with open(DIR_RAW_DICTS / type_ / version / "json" / "game" / f"{target_file}.json", "w", encoding="utf-8", newline="") as fp:
 				json.dump(results_lines_json, fp, ensure_ascii=False, indent=2)
 		# logger.info(f"\t- ({idx + 1} / {len(self._game_texts_file_lists)}) {target_file} 处理完毕")
+		return extraction
 
-	async def _build_json_results_with_passage(self, lines: list[str], able_lines: list[bool], content: str, file: str) -> list[dict]:
+	@staticmethod
+	def _build_json_results_with_passage(table: list[LineRecord], able_lines: list[bool], file: str, version: str) -> list[dict]:
 		"""导出成带 passage 注释的行文本"""
+		version_key = '_'.join(version[2:].split('.'))
 		results_lines_json = []
-		passage_name = None
-		pos_relative = None
-		pos_global = 0
-		for idx, line in enumerate(lines):
-			if line.startswith("::"):
-				pos_relative = 0
-				tmp_ = line.lstrip(":: ")
-				if "[" not in line:
-					passage_name = tmp_.strip()
-				else:
-					for idx_, char in enumerate(tmp_):
-						if char != "[":
-							continue
-						passage_name = tmp_[:idx_].strip()
-						break
-					else:
-						raise
-
-			if able_lines[idx]:
-				pos_start = 0
-				if line != line.lstrip():  # 前面的 \t \s 也要算上
-					for char in line:
-						if char == line.strip()[0]:
-							break
-						pos_start += 1
-				results_lines_json.append({
-					"passage": passage_name,  # 非 twee 文件为 null
-					"filepath": file,
-					"key": f"{idx + 1}_{'_'.join(self._version[2:].split('.'))}|",
-					"original": line.strip(),
-					"translation": "",
-					"pos": pos_relative + pos_start if pos_relative is not None else pos_global + pos_start  # 非 twee 文件为 null
-				})
-				if content[pos_global + pos_start] != line.lstrip()[0]:
-					logger.error(f"pos可能不对！{file} | {passage_name} | {line}".replace("\t", "\\t").replace("\n", "\\n"))
-			if pos_relative is not None and not line.startswith("::"):
-				pos_relative += len(line)
-			pos_global += len(line)
+		for idx, record in enumerate(table):
+			if not able_lines[idx]:
+				continue
+			if not record.text:
+				raise IndexError(f"空行不该被抓取: {idx + 1}")
+			results_lines_json.append({
+				"passage": record.passage,  # 非 twee 文件为 null
+				"filepath": file,
+				"key": f"{idx + 1}_{version_key}|",
+				"original": record.text,
+				"translation": "",
+				"pos": (record.passage_offset if record.passage_offset is not None else record.offset) + record.indent  # 非 twee 文件为 null
+			})
 		return results_lines_json
 
 	""" 去重生肉词典 """
@@ -325,7 +501,7 @@ class ProjectDOL:
 					continue
 
 				with open(mod_file_path, "w", encoding="utf-8-sig", newline="") as fp:
-					csv.writer(fp).writerows(mod_data)
+					csv.writer(fp, lineterminator=DICT_CSV_LINETERMINATOR).writerows(mod_data)
 
 			if not os.listdir(Path(root)):
 				shutil.rmtree(Path(root))
@@ -347,19 +523,40 @@ class ProjectDOL:
 					DIR_RAW_DICTS / self._type / self._version / "json" / "game" / Path(root).relative_to(DIR_PARATRANZ / self._type / "utf8") / f'{file.removesuffix(".csv")}.json',
 				)
 
+		translation_memory = TranslationMemory(self._type)
+		translation_memory.build(DIR_PARATRANZ / self._type / "utf8")
 		tasks = [
-			self._update_for_gather(old_file, new_file, json_file)
+			self._update_for_gather(old_file, new_file, json_file, translation_memory)
 			for old_file, (new_file, json_file) in file_mapping.items()
 		]
+
+		# 汉化包里没有的新文件，也从翻译记忆里找一遍
+		csv_dir = DIR_RAW_DICTS / self._type / self._version / "csv" / "game"
+		json_dir = DIR_RAW_DICTS / self._type / self._version / "json" / "game"
+		mapped_files = {new_file.relative_to(csv_dir) for new_file, _ in file_mapping.values()}
+		for root, dir_list, file_list in os.walk(csv_dir):
+			if "失效词条" in root or "移除文件" in root:
+				continue
+			for file in file_list:
+				relative_file = Path(root).relative_to(csv_dir) / file
+				if relative_file in mapped_files:
+					continue
+				tasks.append(self._update_from_memory_for_gather(
+					csv_dir / relative_file,
+					json_dir / relative_file.parent / f'{file.removesuffix(".csv")}.json',
+					translation_memory
+				))
 		await asyncio.gather(*tasks)
+		translation_memory.dump()
 		await self._integrate_json()
 		logger.info(f"##### {self._mention_name}字典更新完毕 !\n")
 
-	async def _update_for_gather(self, old_file: Path, new_file: Path, json_file: Path):
+	async def _update_for_gather(self, old_file: Path, new_file: Path, json_file: Path, translation_memory: TranslationMemory = None):
 		"""
 		gather 用
 		:param old_file: 下载的汉化文件的绝对路径
 		:param new_file: 本地新抓字典文件的绝对路径
+		:param translation_memory: 同文件里找不到的，去全局翻译记忆里找
 		"""
 		if not new_file.exists():   # 旧文件在新版本中删除/改名了
 			unavailable_file = DIR_RAW_DICTS / self._type / self._version / "csv" / "game" / "移除文件" / Path().joinpath(*old_file.parts[old_file.parts.index("utf8")+1:])
@@ -367,7 +564,7 @@ class ProjectDOL:
 			with open(old_file, "r", encoding="utf-8") as fp:
 				unavailables = list(csv.reader(fp))
 			with open(unavailable_file, "w", encoding="utf-8-sig", newline="") as fp:
-				csv.writer(fp).writerows(unavailables)
+				csv.writer(fp, lineterminator=DICT_CSV_LINETERMINATOR).writerows(unavailables)
 			return
 
 		with open(old_file, "r", encoding="utf-8") as fp:
@@ -388,17 +585,25 @@ class ProjectDOL:
 			json_data: list[dict] = json.load(fp)
 
 		# 1. 未变的键和汉化直接替换
+		changed = False
 		for idx_, row in enumerate(new_data):
 			if row[-1] in old_ens:
-				new_data[idx_][0] = old_data[old_ens[row[-1]]][0]
+				if new_data[idx_][0] != old_data[old_ens[row[-1]]][0]:
+					new_data[idx_][0] = old_data[old_ens[row[-1]]][0]
+					changed = True
 				if len(old_data[old_ens[row[-1]]]) >= 3:
 					ts = old_data[old_ens[row[-1]]][-1].strip()
 					new_data[idx_].append(ts)
+					changed = True
 					try:
 						json_data[idx_]["translation"] = ts
 					except IndexError as e:
 						logger.error(f"json与csv长度不同: {json_file}")
 
+		# 1.5 同文件里没有汉化的，可能是从别的文件挪过来的
+		if translation_memory and self._fill_from_memory(new_data, json_data, json_file, translation_memory):
+			changed = True
+
 		# 2. 不存在的英文移入失效词条
 		unavailables = []
 		for idx_, row in enumerate(old_data):
@@ -412,78 +617,126 @@ class ProjectDOL:
 				# logger.info(f"\t- old: {old_en}")
 				unavailables.append(old_data[idx_])
 		unavailable_file = DIR_RAW_DICTS / self._type / self._version / "csv" / "game" / "失效词条" / Path().joinpath(*old_file.parts[old_file.parts.index("utf8")+1:]) if unavailables else None
-		with open(old_file,  "w", encoding="utf-8-sig", newline="") as fp:
-			csv.writer(fp).writerows(old_data)
 
-		with open(new_file, "w", encoding="utf-8-sig", newline="") as fp:
-			csv.writer(fp).writerows(new_data)
+		if changed:  # 什么都没换的就不用再写一遍了
+			self._write_dict_csv(new_file, new_data)
+			with open(json_file, "w", encoding="utf-8") as fp:
+				json.dump(json_data, fp, ensure_ascii=False, indent=2)
 
+		if unavailable_file:
+			os.makedirs(unavailable_file.parent, exist_ok=True)
+			with open(unavailable_file, "w", encoding="utf-8-sig", newline="") as fp:
+				csv.writer(fp, lineterminator=DICT_CSV_LINETERMINATOR).writerows(unavailables)
+
+	async def _update_from_memory_for_gather(self, new_file: Path, json_file: Path, translation_memory: TranslationMemory):
+		"""gather 用，汉化包里没有对应文件的新文件"""
 		with open(new_file, "r", encoding="utf-8-sig") as fp:
-			problem_data = fp.readlines()
+			new_data = list(csv.reader(fp))
+		with open(json_file, "r", encoding="utf-8") as fp:
+			json_data: list[dict] = json.load(fp)
 
+		if not self._fill_from_memory(new_data, json_data, json_file, translation_memory):
+			return
+
+		self._write_dict_csv(new_file, new_data)
 		with open(json_file, "w", encoding="utf-8") as fp:
 			json.dump(json_data, fp, ensure_ascii=False, indent=2)
 
-		for idx, line in enumerate(problem_data):
-			if "﻿" in line:
-				problem_data[idx] = line.replace("﻿", "")
-
-		with open(new_file, "w", encoding="utf-8-sig") as fp:
-			fp.writelines(problem_data)
+	@staticmethod
+	def _write_dict_csv(filepath: Path, rows: list[list[str]]):
+		"""一次写完：去掉混进格子里的 BOM，只留文件头一个"""
+		with open(filepath, "w", encoding="utf-8-sig", newline="") as fp:
+			csv.writer(fp, lineterminator=DICT_CSV_LINETERMINATOR).writerows(
+				[cell.replace("\ufeff", "") for cell in row]
+				for row in rows
+			)
 
-		if unavailable_file:
-			os.makedirs(unavailable_file.parent, exist_ok=True)
-			with open(unavailable_file, "w", encoding="utf-8-sig", newline="") as fp:
-				csv.writer(fp).writerows(unavailables)
+	@staticmethod
+	def _fill_from_memory(new_data: list[list[str]], json_data: list[dict], json_file: Path, translation_memory: TranslationMemory) -> int:
+		"""没有汉化的行去翻译记忆里找，返回找回了几条"""
+		filled = 0
+		for idx_, row in enumerate(new_data):
+			if len(row) >= 3:
+				continue
+			ts = translation_memory.get(row[-1])
+			if not ts:
+				continue
+			new_data[idx_].append(ts)
+			filled += 1
+			try:
+				json_data[idx_]["translation"] = ts
+			except IndexError as e:
+				logger.error(f"json与csv长度不同: {json_file}")
+		return filled
 
 	async def _integrate_json(self):
-		"""把 json 字典合并成一个大的"""
-		integrated_dict = []
+		"""把 json 字典合并成一个大的，边读边写，内存里只放一个文件的内容；顺带生成列式的紧凑包"""
+		with (
+			open(DIR_DATA_ROOT / "json" / "i18n.json", "w", encoding="utf-8") as fp,
+			tempfile.TemporaryFile("w+", encoding="utf-8") as story_fp,
+			I18nBundleWriter(DIR_DATA_ROOT / "json", compression=I18N_BUNDLE_COMPRESSION) as bundle,
+		):
+			# 文件只过一遍，TypeBInputStoryScript 先写进临时文件，最后接在后面，和 json.dump(indent=2) 的输出一模一样
+			counts = {"TypeBOutputText": 0, "TypeBInputStoryScript": 0}
+			fp.write('{\n  "typeB": {\n    "TypeBOutputText": [')
+			for result_data in self._iter_washed_json():
+				type_b, out_fp = ("TypeBInputStoryScript", story_fp) if "pN" in result_data else ("TypeBOutputText", fp)
+				out_fp.write(",\n" if counts[type_b] else "\n")
+				out_fp.write(self._indent_json(result_data, 6))
+				bundle.add(type_b, result_data)
+				counts[type_b] += 1
+			fp.write("\n    ]" if counts["TypeBOutputText"] else "]")
+
+			fp.write(',\n    "TypeBInputStoryScript": [')
+			story_fp.seek(0)
+			shutil.copyfileobj(story_fp, fp)
+			fp.write("\n    ]" if counts["TypeBInputStoryScript"] else "]")
+			fp.write("\n  }\n}")
+
+	def _iter_washed_json(self):
+		"""逐个文件读出已翻译的词条，处理为 i18n mod 可接受的格式"""
 		for root, dir_list, file_list in os.walk(DIR_RAW_DICTS / self._type / self._version / "json" / "game"):
 			for file in file_list:
 				with open(Path(root) / file, "r", encoding="utf-8") as fp:
 					json_data: list[dict] = json.load(fp)
 
-				json_data = [
-					item for item in json_data
-					if item["original"] != item["translation"] and item["translation"]
-				]
-				integrated_dict.extend(json_data)
-		i18n_dict = await self._wash_json(integrated_dict)
-		with open(DIR_DATA_ROOT / "json" / "i18n.json", "w", encoding="utf-8") as fp:
-			json.dump(i18n_dict, fp, ensure_ascii=False, indent=2)
+				for data in json_data:
+					if data["original"] == data["translation"] or not data["translation"]:
+						continue
+					yield self._wash_json(data)
 
 	@staticmethod
-	async def _wash_json(integrated_dict: list[dict]) -> dict:
+	def _wash_json(data: dict) -> dict:
 		"""处理为 i18n mod 可接受的格式"""
-		i18n_dict = {
-			"typeB": {
-				"TypeBOutputText": [],
-				"TypeBInputStoryScript": []
-			}
+		result_data = {
+			"f": data["original"], "t": data["translation"], "pos": data["pos"]
 		}
-		for data in integrated_dict:
-			result_data = {
-				"f": data["original"], "t": data["translation"], "pos": data["pos"]
-			}
-
-			filename = Path(data["filepath"]).name
-			result_data["fileName"] = filename
-			if filename.endswith(".js"):
-				result_data["js"] = True
-			elif filename.endswith(".css"):
-				result_data["css"] = True
-
-			if data["passage"]:
-				result_data["pN"] = data["passage"]
-				i18n_dict["typeB"]["TypeBInputStoryScript"].append(result_data)
-				continue
-			i18n_dict["typeB"]["TypeBOutputText"].append(result_data)
-		return i18n_dict
+
+		filename = Path(data["filepath"]).name
+		result_data["fileName"] = filename
+		if filename.endswith(".js"):
+			result_data["js"] = True
+		elif filename.endswith(".css"):
+			result_data["css"] = True
+
+		if data["passage"]:
+			result_data["pN"] = data["passage"]
+		return result_data
+
+	@staticmethod
+	def _indent_json(data: dict, level: int) -> str:
+		"""单个词条按 indent=2 序列化，再整体缩进到它在大字典里的位置"""
+		return "\n".join(
+			f"{' ' * level}{line}"
+			for line in json.dumps(data, ensure_ascii=False, indent=2).split("\n")
+		)
 
 	""" 替换游戏原文 """
-	async def apply_dicts(self, blacklist_dirs: list[str] = None, blacklist_files: list[str] = None, debug_flag: bool = False, type_manual: str = None):
-		"""汉化覆写游戏文件"""
+	async def apply_dicts(self, blacklist_dirs: list[str] = None, blacklist_files: list[str] = None, debug_flag: bool = False, type_manual: str = None, key_addressed: bool = True):
+		"""
+		汉化覆写游戏文件
+		:param key_addressed: 按词条键里的行号直接定位，对不上再按原文查找；False 则只按原文查找
+		"""
 		if not self._version:
 			await self.fetch_latest_version()
 
@@ -517,22 +770,67 @@ class ProjectDOL:
 					file_mapping[Path(root).absolute() / file] = DIR_GAME_TEXTS / Path(root).relative_to(DIR_RAW_DICTS / type_manual / self._version / "csv" / "game") / f"{file.split('.')[0]}.twee".replace("utf8\\", "")
 
 		tasks = [
-			self._apply_for_gather(csv_file, twee_file, debug_flag=debug_flag)
+			self._apply_for_gather(csv_file, twee_file, debug_flag=debug_flag, key_addressed=key_addressed)
 			for idx, (csv_file, twee_file) in enumerate(file_mapping.items())
 		]
-		await asyncio.gather(*tasks)
+		js_outputs = [_ for _ in await asyncio.gather(*tasks) if _]
+		self._check_js_syntax(js_outputs)
 		logger.info(f"##### {self._mention_name}汉化覆写完毕 !\n")
 
-	async def _apply_for_gather(self, csv_file: Path, target_file: Path, debug_flag: bool = False):
-		"""gather 用"""
+	def _check_js_syntax(self, js_outputs: list[tuple[Path, list[str]]], workers: int = PROCESS_WORKERS):
+		"""
+		覆写完的 js 一起做语法检测，解释器常驻，不再每个文件重新加载 acorn
+		覆写结果和上次一样的直接用上次的检测结果
+		"""
+		if not js_outputs:
+			return
+		codes = ["".join(raw_targets) for _, raw_targets in js_outputs]
+		digests = [hashlib.md5(code.encode("utf-8")).hexdigest() for code in codes]
+		cache = self._load_js_syntax_cache()
+		missed = [idx for idx, digest in enumerate(digests) if digest not in cache]
+		logger.info(f"\t- 重新检测 {len(missed)} / {len(codes)} 个 js 文件")
+
+		missed_codes = [codes[idx] for idx in missed]
+		if not missed_codes:
+			missed_errors = []
+		elif workers == 1 or len(missed_codes) == 1:
+			if self._acorn is None:
+				self._acorn = Acorn()
+			missed_errors = self._acorn.parse_many(missed_codes)
+		else:
+			with AcornPool(min(workers or os.cpu_count(), len(missed_codes))) as pool:
+				missed_errors = pool.parse_many(missed_codes)
+		for idx, err in zip(missed, missed_errors):
+			cache[digests[idx]] = None if err is None else asdict(err)
+		self._dump_js_syntax_cache({digest: cache[digest] for digest in digests})
+
+		errors = [
+			None if cache[digest] is None else JSSyntaxError(**cache[digest])
+			for digest in digests
+		]
+		for (target_file, raw_targets), err in zip(js_outputs, errors):
+			if err is None:
+				LOGGER_COLOR.info(f"<g>JS 语法检测通过</g> {target_file}")
+				continue
+			try:
+				LOGGER_COLOR.error(f"{target_file} | {err.err_code(raw_targets)}")
+			except ValueError as e:
+				LOGGER_COLOR.error(f"{target_file}")
+
+	async def _apply_for_gather(self, csv_file: Path, target_file: Path, debug_flag: bool = False, key_addressed: bool = True) -> tuple[Path, list[str]] | None:
+		"""gather 用，js 文件返回覆写后的内容留给语法检测"""
 		with open(target_file, "r", encoding="utf-8") as fp:
 			raw_targets: list[str] = fp.readlines()
-		raw_targets_temp = raw_targets.copy()
+		line_index = self._build_line_index(raw_targets)
+		consumed_idxes: set[int] = set()  # 已经替换过的行
+		applied_ens: dict[str, str] = {}  # 已经替换过的原文: 第一条词条的汉化
+		unmatched_ens: list[str] = []
 
 		with open(csv_file, "r", encoding="utf-8") as fp:
 			for row in csv.reader(fp):
 				if len(row) < 3:  # 没汉化
 					continue
+				key = row[0]
 				en, zh = row[-2:]
 				en, zh = en.strip(), zh.strip()
 				if not zh:  # 没汉化/汉化为空
@@ -540,167 +838,120 @@ class ProjectDOL:
 
 				zh = re.sub('^(“)', '"', zh)
 				zh = re.sub('(”)$', '"', zh)
-				if self._is_lack_angle(zh, en):
-					logger.warning(f"\t!!! 可能的尖括号数量错误：{en} | {zh} | https://paratranz.cn/projects/{PARATRANZ_PROJECT_DOL_ID}/strings?text={quote(en)}")
-					if debug_flag:
-						webbrowser.open(f"https://paratranz.cn/projects/{PARATRANZ_PROJECT_DOL_ID}/strings?text={quote(en)}")
-				if self._is_different_event(zh, en):
-					logger.warning(f"\t!!! 可能的事件名称错翻：{en} | {zh} | https://paratranz.cn/projects/{PARATRANZ_PROJECT_DOL_ID}/strings?text={quote(en)}")
+				for issue in self._lint.lint(zh, en, APPLY_LINT_RULES).issues:
+					logger.warning(f"\t!!! {issue.value}：{en} | {zh} | https://paratranz.cn/projects/{PARATRANZ_PROJECT_DOL_ID}/strings?text={quote(en)}")
 					if debug_flag:
 						webbrowser.open(f"https://paratranz.cn/projects/{PARATRANZ_PROJECT_DOL_ID}/strings?text={quote(en)}")
 
-				for idx_, target_row in enumerate(raw_targets_temp):
-					if not target_row.strip():
+				if not key_addressed:
+					if en in applied_ens:  # 同样的原文只认第一条词条
 						continue
+					if en not in line_index:
+						unmatched_ens.append(en)
+						continue
+					for idx_ in line_index.pop(en):
+						self._replace_line(raw_targets, idx_, en, zh)
+					applied_ens[en] = zh
+					continue
 
-					if en == target_row.strip():
-						raw_targets[idx_] = target_row.replace(en, zh).replace(" \n", "\n").lstrip(" ")
-						raw_targets_temp[idx_] = ""
+				# 1. 键里的行号对得上就直接替换
+				idx_ = self._parse_key_line_idx(key)
+				if (
+					idx_ is not None
+					and idx_ < len(raw_targets)
+					and idx_ not in consumed_idxes
+					and raw_targets[idx_].strip() == en
+				):
+					self._replace_line(raw_targets, idx_, en, zh)
+					consumed_idxes.add(idx_)
+					applied_ens.setdefault(en, zh)
+					continue
+
+				# 2. 对不上 (原文行号变了)，按原文找第一个还没替换过的行
+				candidates = line_index.get(en, ())
+				while candidates and candidates[0] in consumed_idxes:
+					candidates.popleft()
+				if candidates:
+					idx_ = candidates.popleft()
+					self._replace_line(raw_targets, idx_, en, zh)
+					consumed_idxes.add(idx_)
+					applied_ens.setdefault(en, zh)
+				elif en not in applied_ens:
+					unmatched_ens.append(en)
+
+		# 3. 和按原文查找时一样，没有词条单独对应的同文行也用第一条词条替换
+		if key_addressed:
+			for en, zh in applied_ens.items():
+				for idx_ in line_index.get(en, []):
+					if idx_ in consumed_idxes:
+						continue
+					self._replace_line(raw_targets, idx_, en, zh)
+					consumed_idxes.add(idx_)
+
+		for en in unmatched_ens:
+			logger.warning(f"\t!!! 未在原文中找到的词条：{en} | {target_file} | https://paratranz.cn/projects/{PARATRANZ_PROJECT_DOL_ID}/strings?text={quote(en)}")
 
-		if target_file.name.endswith(".js"):
-			try:
-				self._acorn.parse("".join(raw_targets))
-				LOGGER_COLOR.info(f"<g>JS 语法检测通过</g> {target_file}")
-			except JSSyntaxError as err:
-				try:
-					LOGGER_COLOR.error(f"{target_file} | {err.err_code(raw_targets)}")
-				except ValueError as e:
-					LOGGER_COLOR.error(f"{target_file}")
 		with open(target_file, "w", encoding="utf-8") as fp:
 			fp.writelines(raw_targets)
+		if target_file.name.endswith(".js"):
+			return target_file, raw_targets
 		# logger.info(f"\t- ({idx + 1} / {full}) {target_file.__str__().split('game')[1]} 覆写完毕")
 
-	@staticmethod
-	def _is_lack_angle(line_zh: str, line_en: str):
-		"""<<> 缺一个 >"""
-		if ("<" not in line_en and ">" not in line_en) or ParseTextTwee.is_only_marks(line_en):
-			return False
-
-		# 首尾不好判断
-		if line_zh[0] == "<":
-			line_zh = f"_{line_zh}"
-		if line_en[0] == "<":
-			line_en = f"_{line_en}"
-		if line_zh[-1] == ">":
-			line_zh = f"{line_zh}_"
-		if line_en[-1] == ">":
-			line_en = f"{line_en}_"
-
-		left_angle_single_zh = re.findall(r"[^<=](<)[^<=3]", line_zh)
-		right_angle_single_zh = re.findall(r"[^>=](>)[^>=:]", line_zh)
-		if "<<" not in line_en and ">>" not in line_en:
-			if len(left_angle_single_zh) == len(right_angle_single_zh):
-				return False
-			# print(f"las: {len(left_angle_single_zh)}({left_angle_single_zh}) - ras: {len(right_angle_single_zh)}({right_angle_single_zh}) | {line_zh}")
-			left_angle_single_en = re.findall(r"[^<=](<)[^<=3]", line_en)
-			right_angle_single_en = re.findall(r"[^>=](>)[^>=:]", line_en)
-			return (
-				len(left_angle_single_en) != len(left_angle_single_zh)
-				or len(right_angle_single_en) != len(right_angle_single_zh)
-			)  # 形如 < > <, 也只有这一种情况
-
-		left_angle_double_zh = re.findall(r"(<<)", line_zh)
-		right_angle_double_zh = re.findall(r"(>>)", line_zh)
-		if len(left_angle_double_zh) == len(right_angle_double_zh):
-			return False
-
-		left_angle_double_en = re.findall(r"(<<)", line_en)
-		right_angle_double_en = re.findall(r"(>>)", line_en)
-		return (
-			len(left_angle_double_en) != len(left_angle_double_zh)
-			or len(right_angle_double_en) != len(right_angle_double_zh)
-		)  # 形如 << >> <<
-
-	@staticmethod
-	def _is_lack_square(line_zh: str, line_en: str):
-		"""缺一个 [ 或 ]"""
-		if "[" not in line_en and "]" not in line_en:
-			return False
-
-		# 首尾不好判断
-		if line_zh[0] == "[":
-			line_zh = f"_{line_zh}"
-		if line_en[0] == "[":
-			line_en = f"_{line_en}"
-		if line_zh[-1] == "]":
-			line_zh = f"{line_zh}_"
-		if line_en[-1] == "]":
-			line_en = f"{line_en}_"
-
-		left_square_single_zh = re.findall(r"[^\[](\[)[^\[]", line_zh)
-		right_square_single_zh = re.findall(r"[^]](])[^]]", line_zh)
-		if "[[" not in line_en and "]]" not in line_en:
-			if len(left_square_single_zh) == len(right_square_single_zh):
-				return False
-			left_square_single_en = re.findall(r"[^\[](\[)[^\[]", line_en)
-			right_square_single_en = re.findall(r"[^]](])[^]]", line_en)
-			return (
-				len(left_square_single_en) != len(left_square_single_zh)
-				or len(right_square_single_en) != len(right_square_single_zh)
-			)  # 形如 [ ] [, 也只有这一种情况
-
-		left_square_double_zh = re.findall(r"(\[\[)", line_zh)
-		right_square_double_zh = re.findall(r"(]])", line_zh)
-		if len(left_square_double_zh) == len(right_square_double_zh):
-			return False
-		left_square_double_en = re.findall(r"(\[\[)", line_en)
-		right_square_double_en = re.findall(r"(]])", line_en)
-		return (
-				len(left_square_double_en) != len(left_square_double_zh)
-				or len(right_square_double_en) != len(right_square_double_zh)
-		)  # 形如 [[ ]] [[
-
-	@staticmethod
-	def _is_different_event(line_zh: str, line_en: str):
-		"""<<link [[TEXT|EVENT]]>> 中 EVENT 打错了"""
-		if "<<link [[" not in line_en or not line_zh:
-			return False
-		event_en = re.findall(r"<<link\s\[\[.*?\|(.*?)\]\]", line_en)
-		if not event_en:
-			return False
-		event_zh = re.findall(r"<<link\s\[\[.*?\|(.*?)\]\]", line_zh)
-		return event_en != event_zh
-
-	@staticmethod
-	def _is_full_notation_new(line_zh: str, line_en: str):
-		"""半全角打错了"""
-		if "cn_name" in line_zh or "writ_cn" in line_zh:
-			return False
-		left_angle_double_en = re.findall(r'(",)', line_en)
-		left_angle_double_zh = re.findall(r'(",)', line_zh)
-		return len(left_angle_double_en) != len(left_angle_double_zh)
+	@property
+	def _js_syntax_cache_file(self) -> Path:
+		return DIR_CACHE_ROOT / f"js_syntax_{self._type}.json"
 
 	@staticmethod
-	def _is_lack_yin(line_zh: str, line_en: str):
-		"""缺少引号"""
-		right_angle_double_en = re.findall(r'(")', line_en)
-		right_angle_double_zh = re.findall(r'(")', line_zh)
-		return (
-			(len(right_angle_double_en) - len(right_angle_double_zh))%2 != 0
-		)
+	def _acorn_fingerprint() -> str | None:
+		"""acorn 本身的哈希，换了版本旧的检测结果就不能用；还没装 acorn 时为 None"""
+		acorn_js = DIR_ARCON_ROOT / "dist" / "acorn.js"
+		if not acorn_js.exists():
+			return None
+		return hashlib.md5(acorn_js.read_bytes()).hexdigest()
+
+	def _load_js_syntax_cache(self) -> dict[str, dict | None]:
+		"""上次检测的结果：覆写后 js 内容的哈希: 语法错误，通过为 None"""
+		if not self._js_syntax_cache_file.exists():
+			return {}
+		with open(self._js_syntax_cache_file, "r", encoding="utf-8") as fp:
+			cache: dict = json.load(fp)
+		fingerprint = self._acorn_fingerprint()
+		if fingerprint is None or cache.get("acorn") != fingerprint:  # 没装 acorn 也当作没缓存
+			return {}
+		return cache["results"]
+
+	def _dump_js_syntax_cache(self, results: dict[str, dict | None]):
+		if (fingerprint := self._acorn_fingerprint()) is None:
+			return
+		os.makedirs(DIR_CACHE_ROOT, exist_ok=True)
+		with open(self._js_syntax_cache_file, "w", encoding="utf-8") as fp:
+			json.dump({"acorn": fingerprint, "results": results}, fp, ensure_ascii=False)
 
 	@staticmethod
-	def _is_full_comma(line: str):
-		"""全角逗号"""
-		return line.endswith('"，')
+	def _build_line_index(lines: list[str]) -> dict[str, deque[int]]:
+		"""去掉首尾空白后的行文本: 所在行号，每个文件只建一次；按顺序从头取，用 deque"""
+		line_index: dict[str, deque[int]] = {}
+		for idx, line in enumerate(lines):
+			if line_stripped := line.strip():
+				line_index.setdefault(line_stripped, deque()).append(idx)
+		return line_index
 
 	@staticmethod
-	def _is_full_notation(line_zh: str, line_en: str):
-		"""单双引号打错了"""
-		if '",' in line_en and '”,' in line_zh:
-			return True
-		return ': "' in line_en and ': “' in line_zh
+	def _parse_key_line_idx(key: str) -> int | None:
+		"""词条键形如 123_5_2_0|，取出 0 开始的行号"""
+		line_no = key.split("_", 1)[0]
+		if not line_no.isdigit() or int(line_no) < 1:
+			return None
+		return int(line_no) - 1
 
 	@staticmethod
-	def _is_lost_notation(line_zh: str, line_en: str):
-		"""漏了引号逗号"""
-		if any(line_en.endswith(_) for _ in {"',", '",', "`,"}) and line_zh[-2:] != line_en[-2:]:
-			return True
-		return False
+	def _replace_line(raw_targets: list[str], idx: int, en: str, zh: str):
+		"""替换一行"""
+		raw_targets[idx] = raw_targets[idx].replace(en, zh).replace(" \n", "\n").lstrip(" ")
 
 	async def get_lastest_commit(self) -> None:
 		ref_name = self.get_type("master", "dev")
-		async with httpx.AsyncClient(verify=False) as client:
+		async with shared_client(self._client) as client:
 			response = await client.get(REPOSITORY_COMMITS_URL_COMMON, params={"ref_name": ref_name})
 			if response.status_code != 200:
 				logger.error("获取源仓库 commit 出错！")
@@ -953,7 +1204,7 @@ class ProjectDOL:
 
 	""" i18n 相关"""
 	async def download_modloader_autobuild(self):
-		async with httpx.AsyncClient(verify=False) as client:
+		async with shared_client(self._client) as client:
 			await self._get_latest_modloader_autobuild(client)
 
 	async def _get_latest_modloader_autobuild(self, client: httpx.AsyncClient):
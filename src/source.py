@@ -0,0 +1,128 @@
+from pathlib import Path
+from typing import NamedTuple
+from zipfile import ZipFile
+
+
+def split_lines(content: str) -> list[str]:
+	"""和文本模式 readlines() 一样按 \\n 切，保留行尾"""
+	lines = content.split("\n")
+	result = [f"{line}\n" for line in lines[:-1]]
+	if lines[-1]:
+		result.append(lines[-1])
+	return result
+
+
+class LineRecord(NamedTuple):
+	"""一行的位置信息"""
+	offset: int  # 在全文中的位置
+	indent: int  # 行首空白的长度
+	text: str  # 去掉首尾空白
+	passage: str | None  # 所在 passage，非 twee 文件为 None
+	passage_offset: int | None  # 在 passage 中的位置，非 twee 文件为 None
+
+
+def build_line_table(lines: list[str]) -> list[LineRecord]:
+	"""一趟算完每行的位置、缩进、文本和所在 passage，导出 csv 和 json 都用它"""
+	table = []
+	passage_name = None
+	pos_relative = None
+	pos_global = 0
+	for line in lines:
+		is_passage = line.startswith("::")
+		if is_passage:
+			pos_relative = 0
+			passage_name = line.lstrip(":: ").split("[", 1)[0].strip()
+		lstripped = line.lstrip()
+		table.append(LineRecord(pos_global, len(line) - len(lstripped), lstripped.rstrip(), passage_name, pos_relative))
+		if pos_relative is not None and not is_passage:
+			pos_relative += len(line)
+		pos_global += len(line)
+	return table
+
+
+class GameSource:
+	"""
+	游戏源码的统一读取入口，可以是解压出来的目录，也可以是没解压的 zip
+	文件都用解压后的路径表示 (root / game / ...)，两种来源的路径、索引通用
+	"""
+	def __init__(self, root: Path, zip_path: Path = None):
+		"""
+		:param root: 解压后的游戏根目录，如 degrees-of-lewdity-master
+		:param zip_path: 源码压缩包，传了就直接从压缩包里读
+		"""
+		self._root = root
+		self._zip_path = zip_path
+		self._zip: ZipFile | None = None  # 每个进程自己打开一次，用完 close
+		self._members: dict[str, str] | None = None  # 相对路径: 压缩包里的路径
+
+	def __getstate__(self) -> dict:
+		"""进程池传参时只带路径，不带打开的 ZipFile 和整个压缩包的文件列表"""
+		return self.__dict__ | {"_zip": None, "_members": None}
+
+	def close(self):
+		"""关掉打开的压缩包，之后再读会重新打开"""
+		if self._zip is not None:
+			self._zip.close()
+		self._zip = None
+		self._members = None
+
+	@property
+	def root(self) -> Path:
+		return self._root
+
+	@property
+	def is_zip(self) -> bool:
+		return self._zip_path is not None
+
+	def _open_zip(self) -> ZipFile:
+		if self._zip is None:
+			self._zip = ZipFile(self._zip_path)
+		return self._zip
+
+	def _zip_members(self) -> dict[str, str]:
+		"""去掉最外层目录后的相对路径: 压缩包里的路径"""
+		if self._members is None:
+			self._members = {
+				name.split("/", 1)[1]: name
+				for name in self._open_zip().namelist()
+				if "/" in name and not name.endswith("/")
+			}
+		return self._members
+
+	def iter_files(self, subdir: str = "game", suffixes: tuple[str, ...] = None) -> list[Path]:
+		"""subdir 下所有文件的路径，按路径排序"""
+		if self.is_zip:
+			prefix = f"{subdir}/"
+			files = [
+				self._root / relpath
+				for relpath in self._zip_members()
+				if relpath.startswith(prefix)
+			]
+		else:
+			files = [path for path in (self._root / subdir).rglob("*") if path.is_file()]
+		if suffixes:
+			files = [path for path in files if path.name.endswith(suffixes)]
+		return sorted(files)
+
+	def read_bytes(self, path: Path) -> bytes:
+		if not self.is_zip:
+			return path.read_bytes()
+		relpath = path.relative_to(self._root).as_posix()
+		return self._open_zip().read(self._zip_members()[relpath])
+
+	def read_text(self, path: Path) -> str:
+		"""解码一次，换行统一成 \\n，和文本模式读出来的一样"""
+		return self.read_bytes(path).decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+
+	def read(self, path: Path) -> tuple[str, list[str]]:
+		"""全文和按行切好的，只读一次文件"""
+		content = self.read_text(path)
+		return content, split_lines(content)
+
+
+__all__ = [
+	"split_lines",
+	"LineRecord",
+	"build_line_table",
+	"GameSource",
+]
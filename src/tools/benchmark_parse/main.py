@@ -0,0 +1,75 @@
+"""
+逐行判断的耗时基准，跑一遍 game/ 下所有 twee 文件，看每个 is_* 平均每行多久
+改判断前后各跑一次对比：python -m src.tools.benchmark_parse.main [游戏根目录] [重复次数]
+"""
+import sys
+import time
+from pathlib import Path
+
+from src.consts import DIR_GAME_ROOT_COMMON, SUFFIX_TWEE
+from src.parse_text import ParseTextTwee
+from src.source import GameSource
+
+PREDICATES = sorted(
+	name for name in dir(ParseTextTwee)
+	if name.startswith("is_") and callable(getattr(ParseTextTwee, name))
+)
+
+
+def collect_lines(root: Path) -> dict[Path, list[str]]:
+	"""所有 twee 文件按行切好"""
+	source = GameSource(root)
+	return {
+		file: source.read(file)[1]
+		for file in source.iter_files("game", (SUFFIX_TWEE,))
+	}
+
+
+def bench_predicates(lines: list[str], repeat: int) -> dict[str, float]:
+	"""每个判断跑 repeat 遍所有行，取最快的一次"""
+	results = {}
+	for name in PREDICATES:
+		func = getattr(ParseTextTwee, name)
+		best = float("inf")
+		for _ in range(repeat):
+			start = time.perf_counter()
+			for line in lines:
+				func(line)
+			best = min(best, time.perf_counter() - start)
+		results[name] = best
+	return results
+
+
+def bench_parse(files: dict[Path, list[str]], repeat: int) -> float:
+	"""整套 parse() 的耗时，取最快的一次"""
+	best = float("inf")
+	for _ in range(repeat):
+		start = time.perf_counter()
+		for file, lines in files.items():
+			ParseTextTwee(lines, file).parse()
+		best = min(best, time.perf_counter() - start)
+	return best
+
+
+def main(root: Path = DIR_GAME_ROOT_COMMON, repeat: int = 5):
+	files = collect_lines(root)
+	lines = [line.strip() for file_lines in files.values() for line in file_lines if line.strip()]
+	print(f"{len(files)} 个 twee 文件, {len(lines)} 行, 重复 {repeat} 次取最快")
+	if not lines:
+		return
+
+	results = bench_predicates(lines, repeat)
+	for name, cost in sorted(results.items(), key=lambda item: -item[1]):
+		print(f"{name:<32}{cost * 1000:>10.2f} ms{cost / len(lines) * 1e9:>10.0f} ns/行")
+	total = sum(results.values())
+	print(f"{'is_* 合计':<30}{total * 1000:>10.2f} ms{total / len(lines) * 1e9:>10.0f} ns/行")
+
+	cost = bench_parse(files, repeat)
+	print(f"{'parse() 合计':<30}{cost * 1000:>10.2f} ms{cost / len(lines) * 1e9:>10.0f} ns/行")
+
+
+if __name__ == "__main__":
+	main(
+		Path(sys.argv[1]) if len(sys.argv) > 1 else DIR_GAME_ROOT_COMMON,
+		int(sys.argv[2]) if len(sys.argv) > 2 else 5,
+	)
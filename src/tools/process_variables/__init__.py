@@ -1 +1 @@
-from .main import VariablesProcess
+from .main import SetRunMatcher, VariablesProcess
@@ -5,6 +5,7 @@
 <<run VAR ...>>
 """
 import asyncio
+import hashlib
 import json
 import os
 import re
@@ -14,11 +15,13 @@ from pprint import pprint
 
 from src import logger
 from src.consts import *
+from src.source import GameSource
 from aiofiles import open as aopen
 
 SELF_ROOT = Path(__file__).parent
 
 set_CONTENTS = None
+SET_RUN_INDEX: dict[Path, list[str]] | None = None
 
 FREQ_FUNCTIONS = {
     ".push(",
@@ -35,9 +38,51 @@ class Regexes(Enum):
     SET_RUN_REGEXES: re.Pattern = re.compile("""<<(run|set)(?:\s+((?:(?:\/\*[^*]*\*+(?:[^/*][^*]*\*+)*\/)|(?:\/\/.*\n)|(?:`(?:\\.|[^`\\\n])*?`)|(?:"(?:\\.|[^"\\\n])*?")|(?:'(?:\\.|[^'\\\n])*?')|(?:\[(?:[<>]?[Ii][Mm][Gg])?\[[^\r\n]*?\]\]+)|[^>]|(?:>(?!>)))*?))?>>""")
 
 
+class SetRunMatcher:
+    """
+    一行里是否含有任意一条 <<set>>/<<run>>
+    所有条目建成一棵字典树，只从公共前缀 (通常是 "<<") 出现的位置往下走，一趟扫完
+    """
+    _END = ""
+
+    def __init__(self, patterns: list[str]):
+        self._root: dict = {}
+        for pattern in patterns:
+            if not pattern:
+                continue
+            node = self._root
+            for char in pattern:
+                node = node.setdefault(char, {})
+            node[self._END] = True
+        self._anchor = os.path.commonprefix([_ for _ in patterns if _])
+
+    def __bool__(self) -> bool:
+        return bool(self._root)
+
+    def search(self, line: str) -> bool:
+        """line 中有没有任意一条"""
+        if not self._root:
+            return False
+
+        length = len(line)
+        start = line.find(self._anchor)
+        while start != -1:
+            node = self._root
+            for idx in range(start, length):
+                node = node.get(line[idx])
+                if node is None:
+                    break
+                if self._END in node:
+                    return True
+            start = line.find(self._anchor, start + 1) if start + 1 < length else -1
+        return False
+
+
 class VariablesProcess:
     """我再也不会不写注释了"""
-    def __init__(self):
+    def __init__(self, source: GameSource = None):
+        """:param source: 游戏源码，不传则读解压出来的目录"""
+        self._source = source or GameSource(DIR_GAME_ROOT_COMMON)
         self._all_file_paths = set()  # 所有 .twee 文件绝对路径
 
         self._categorize_variables = []  # 所有 .twee 文件中的变量分类：{path, variables}
@@ -50,11 +95,7 @@ class VariablesProcess:
 
     def fetch_all_file_paths(self) -> set[Path]:
         """ 获取所有 .twee 文件绝对路径"""
-        for root, dir_list, file_list in os.walk(DIR_GAME_TEXTS_COMMON):
-        # for root, dir_list, file_list in os.walk(DIR_GAME_TEXTS_DEV):
-            for file in file_list:
-                if file.endswith(SUFFIX_TWEE):
-                    self._all_file_paths.add(Path(root).absolute() / file)
+        self._all_file_paths.update(self._source.iter_files("game", (SUFFIX_TWEE,)))
         return self._all_file_paths
 
     async def fetch_all_variables(self) -> None:
@@ -116,20 +157,36 @@ class VariablesProcess:
             json.dump(new_data, fp, ensure_ascii=False, indent=2)
 
     def fetch_all_set_content(self):
-        """ 获取所有 <<set>> 内容，写入 setto 目录里，有了就不要再创建了"""
+        """ 获取所有 <<set>> 内容，写入 setto 目录里，按文件内容哈希缓存，只重新扫描改过的文件"""
         global set_CONTENTS
 
         if set_CONTENTS:
             return set_CONTENTS
 
+        cached_contents: dict[str, dict] = {}
         if (SELF_ROOT / "setto" / "_set_contents.json").exists():
             with open(SELF_ROOT / "setto" / "_set_contents.json", "r", encoding="utf-8") as fp:
-                data = json.load(fp)
-            set_CONTENTS = data
-            return data
-
-        for file in self._all_file_paths:
-            self._fetch_all_set_content(file)
+                cached_contents = {item["path"]: item for item in json.load(fp)}
+
+        if not self._all_file_paths:
+            self.fetch_all_file_paths()
+
+        rescanned = 0
+        for file in sorted(self._all_file_paths):
+            raw = self._source.read_bytes(file)
+            digest = hashlib.md5(raw).hexdigest()
+            cached = cached_contents.get(file.__str__())
+            if cached and cached.get("hash") == digest:
+                lines = cached["lines"]
+            else:
+                lines = self._fetch_all_set_content(raw.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n"))
+                rescanned += 1
+            self._categorize_all_set_contents.append({
+                "path": file.__str__(),
+                "hash": digest,  # 文件内容变了就重新扫描
+                "lines": lines
+            })
+        logger.info(f"\t- <<set>>/<<run>> 重新扫描 {rescanned} / {len(self._all_file_paths)} 个文件")
 
         set_CONTENTS = self._categorize_all_set_contents
         os.makedirs(SELF_ROOT / "setto", exist_ok=True)
@@ -150,11 +207,22 @@ class VariablesProcess:
 
         return self._categorize_all_set_contents
 
-    def _fetch_all_set_content(self, file: Path):
-        """ 异步任务用 """
-        filename = file.name
-        with open(file, "r", encoding="utf-8") as fp:
-            raw = fp.read()
+    def fetch_set_run_index(self) -> dict[Path, list[str]]:
+        """ 文件绝对路径: 文件中所有 <<set>>/<<run>>，每个进程只建一次"""
+        global SET_RUN_INDEX
+
+        if SET_RUN_INDEX is not None:
+            return SET_RUN_INDEX
+
+        SET_RUN_INDEX = {
+            Path(item["path"]): item["lines"]
+            for item in self.fetch_all_set_content()
+        }
+        return SET_RUN_INDEX
+
+    @staticmethod
+    def _fetch_all_set_content(raw: str) -> list[str]:
+        """ 单个文件的所有 <<set>>/<<run>> """
         all_set_contents = re.findall(Regexes.SET_RUN_REGEXES.value, raw)
         """
         标准语法:
@@ -174,15 +242,12 @@ class VariablesProcess:
         """
 
         if len(all_set_contents) < 2:
-            return
+            return []
 
         # FIXME: 开摆，不分类了，全部提取出来。
-        self._categorize_all_set_contents.append({
-	        "path": file.__str__(),
-	        "lines": list({
-		        f"<<{head} {args}>>"
-		        for (head, args) in all_set_contents
-	        })
+        return sorted({
+            f"<<{head} {args}>>"
+            for (head, args) in all_set_contents
         })
 
         # all_heads, all_set_contents = [_[0] for _ in all_set_contents], [_[1] for _ in all_set_contents]
@@ -332,7 +397,7 @@ class VariablesProcess:
 def main():
     var = VariablesProcess()
     var.fetch_all_file_paths()
-    var.fetch_all_set_content()
+    var.fetch_set_run_index()
     # await var.fetch_all_variables()
     # await var.build_variables_notations()
 
@@ -348,5 +413,6 @@ if __name__ == '__main__':
     main()
 
 __all__ = [
+    "SetRunMatcher",
     "VariablesProcess"
 ]
@@ -0,0 +1,62 @@
+import csv
+import json
+import os
+from pathlib import Path
+
+from .consts import *
+from .log import logger
+
+
+class TranslationMemory:
+	"""全局翻译记忆：规范化后的英文: 汉化，跨文件找回挪了位置的词条"""
+	def __init__(self, type_: str = "common"):
+		self._type = type_
+		self._memory: dict[str, str] = {}
+
+	def __len__(self) -> int:
+		return len(self._memory)
+
+	@property
+	def filepath(self) -> Path:
+		return DIR_CACHE_ROOT / f"translation_memory_{self._type}.json"
+
+	@staticmethod
+	def normalize(text: str) -> str:
+		"""去掉首尾空白，中间的连续空白只算一个"""
+		return " ".join(text.split())
+
+	def get(self, en: str) -> str | None:
+		return self._memory.get(self.normalize(en))
+
+	def build(self, paratranz_dir: Path):
+		"""先读上次存下的，再用这次导出的汉化覆盖"""
+		if self.filepath.exists():
+			with open(self.filepath, "r", encoding="utf-8") as fp:
+				self._memory = json.load(fp)
+
+		current: dict[str, str] = {}
+		for root, dir_list, file_list in os.walk(paratranz_dir):
+			dir_list.sort()
+			if "失效词条" in root or "移除文件" in root:
+				continue
+			for file in sorted(file_list):
+				with open(Path(root) / file, "r", encoding="utf-8") as fp:
+					for row in csv.reader(fp):
+						if len(row) < 3:  # 没翻译的
+							continue
+						zh = row[-1].strip()
+						if not zh:
+							continue
+						current.setdefault(self.normalize(row[-2]), zh)  # 同样的英文以第一条为准
+		self._memory.update(current)
+		logger.info(f"\t- 翻译记忆共 {len(self._memory)} 条，本次导出 {len(current)} 条")
+
+	def dump(self):
+		os.makedirs(self.filepath.parent, exist_ok=True)
+		with open(self.filepath, "w", encoding="utf-8") as fp:
+			json.dump(self._memory, fp, ensure_ascii=False)
+
+
+__all__ = [
+	"TranslationMemory"
+]
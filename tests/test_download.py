@@ -0,0 +1,205 @@
+import asyncio
+import json
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import httpx
+
+from src.download import chunk_download, part_path, stream_download, validator_path
+
+
+class _RangeHandler(BaseHTTPRequestHandler):
+    """支持 Range / If-Range 的本地文件服务器"""
+    def do_GET(self):
+        server = self.server
+        server.requests.append(dict(self.headers))
+        content, etag = server.content, server.etag
+        offset = 0
+        if_range = self.headers.get("If-Range")
+        if (range_ := self.headers.get("Range")) and if_range in {None, etag}:
+            offset = int(range_.removeprefix("bytes=").split("-")[0])
+
+        self.send_response(206 if offset else 200)
+        if etag:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(content) - offset))
+        if offset:
+            self.send_header("Content-Range", f"bytes {offset}-{len(content) - 1}/{len(content)}")
+        self.end_headers()
+        if server.drop_after:  # 只发一部分就断开，只断一次
+            self.wfile.write(content[offset:offset + server.drop_after])
+            self.wfile.flush()
+            server.drop_after = None
+            self.close_connection = True
+            return
+        self.wfile.write(content[offset:])
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestStreamDownload(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _RangeHandler)
+        self.server.requests = []
+        self.server.content = bytes(range(256)) * 64
+        self.server.etag = '"v1"'
+        self.server.drop_after = None
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/dol.zip"
+
+        self.tmp = tempfile.TemporaryDirectory()
+        self.save_path = Path(self.tmp.name) / "dol.zip"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def _download(self) -> bool:
+        async def _run():
+            async with httpx.AsyncClient() as client:
+                return await stream_download(self.url, self.save_path, client, backoff=0)
+        return asyncio.run(_run())
+
+    def _leave_part(self, content: bytes, etag: str = None):
+        part_path(self.save_path).write_bytes(content)
+        if etag:
+            validator_path(self.save_path).write_text(json.dumps({"etag": etag}), encoding="utf-8")
+
+    def test_fresh_download(self):
+        self.assertTrue(self._download())
+        self.assertEqual(self.save_path.read_bytes(), self.server.content)
+        self.assertFalse(part_path(self.save_path).exists())
+        self.assertFalse(validator_path(self.save_path).exists())
+
+    def test_resume_unchanged(self):
+        self._leave_part(self.server.content[:1000], '"v1"')
+        self.assertTrue(self._download())
+        self.assertEqual(self.save_path.read_bytes(), self.server.content)
+        self.assertEqual(self.server.requests[0]["Range"], "bytes=1000-")
+        self.assertEqual(self.server.requests[0]["If-Range"], '"v1"')
+
+    def test_resume_changed_upstream(self):
+        """上游文件变了，If-Range 对不上，服务器给完整的新文件，不能拼接新旧内容"""
+        old_content = self.server.content
+        self.server.content = bytes(reversed(old_content))
+        self.server.etag = '"v2"'
+        self._leave_part(old_content[:1000], '"v1"')
+        self.assertTrue(self._download())
+        self.assertEqual(self.save_path.read_bytes(), self.server.content)
+
+    def test_part_without_validator(self):
+        """没记校验信息的 .part 不续传"""
+        self._leave_part(b"\xff" * 1000)
+        self.assertTrue(self._download())
+        self.assertEqual(self.save_path.read_bytes(), self.server.content)
+        self.assertNotIn("Range", self.server.requests[0])
+
+    def test_drop_without_validator(self):
+        """第一次响应没有 ETag / Last-Modified，断了之后不能续传，从头下"""
+        self.server.content = bytes(range(256)) * 1024
+        self.server.etag = None
+        self.server.drop_after = 150 * 1024
+        self.assertTrue(self._download())
+        self.assertEqual(self.save_path.read_bytes(), self.server.content)
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertNotIn("Range", self.server.requests[1])
+        self.assertNotIn("If-Range", self.server.requests[1])
+
+
+class _StubRangeServer:
+    """给 httpx.MockTransport 用的假服务器，支持 Range / If-Range"""
+    def __init__(self, content: bytes, etag: str | None = '"v1"', ranges: bool = True):
+        self.content = content
+        self.etag = etag
+        self.ranges = ranges
+        self.requests: list[httpx.Request] = []
+        self.fail_once: set[str] = set()  # 这些 Range 第一次返回 500
+        self.change_after: int | None = None  # 第几个请求之后文件变成新版本
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if self.change_after is not None and len(self.requests) > self.change_after:
+            self.content, self.etag, self.change_after = bytes(reversed(self.content)), '"v2"', None
+
+        range_ = request.headers.get("Range")
+        if range_ in self.fail_once:
+            self.fail_once.remove(range_)
+            return httpx.Response(500)
+        headers = {"ETag": self.etag} if self.etag else {}
+        if_range = request.headers.get("If-Range")
+        if not self.ranges or not range_ or if_range not in {None, self.etag}:
+            return httpx.Response(200, headers=headers, content=self.content)
+        start, _, end = range_.removeprefix("bytes=").partition("-")
+        start, end = int(start), int(end) if end else len(self.content) - 1
+        headers["Content-Range"] = f"bytes {start}-{end}/{len(self.content)}"
+        return httpx.Response(206, headers=headers, content=self.content[start:end + 1])
+
+
+class TestChunkDownload(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.save_path = Path(self.tmp.name) / "dol.zip"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _download(self, server: _StubRangeServer) -> bool:
+        async def _run():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(server.handler)) as client:
+                return await chunk_download("http://dol.test/dol.zip", self.save_path, client, piece_size=1000, backoff=0)
+        return asyncio.run(_run())
+
+    def _chunk_requests(self, server: _StubRangeServer) -> list[httpx.Request]:
+        return [request for request in server.requests if request.headers.get("Range", "bytes=0-0") != "bytes=0-0"]
+
+    def test_chunks(self):
+        """每片都带上探测时的 ETag"""
+        server = _StubRangeServer(bytes(range(256)) * 40)
+        self.assertTrue(self._download(server))
+        self.assertEqual(self.save_path.read_bytes(), server.content)
+        self.assertEqual(len(self._chunk_requests(server)), 11)
+        self.assertTrue(all(request.headers["If-Range"] == '"v1"' for request in self._chunk_requests(server)))
+
+    def test_fallback_without_ranges(self):
+        """不支持 Range 就退回单线程下载"""
+        server = _StubRangeServer(bytes(range(256)) * 40, ranges=False)
+        self.assertTrue(self._download(server))
+        self.assertEqual(self.save_path.read_bytes(), server.content)
+        self.assertEqual(len(server.requests), 2)
+        self.assertNotIn("Range", server.requests[1].headers)
+
+    def test_fallback_without_validator(self):
+        """没有 ETag / Last-Modified 确认不了文件没变，也退回单线程下载"""
+        server = _StubRangeServer(bytes(range(256)) * 40, etag=None)
+        self.assertTrue(self._download(server))
+        self.assertEqual(self.save_path.read_bytes(), server.content)
+        self.assertEqual(self._chunk_requests(server), [])
+
+    def test_chunk_retry(self):
+        """一片失败了只重下这一片"""
+        server = _StubRangeServer(bytes(range(256)) * 40)
+        server.fail_once = {"bytes=3000-3999"}
+        self.assertTrue(self._download(server))
+        self.assertEqual(self.save_path.read_bytes(), server.content)
+        ranges = [request.headers["Range"] for request in self._chunk_requests(server)]
+        self.assertEqual(ranges.count("bytes=3000-3999"), 2)
+        self.assertEqual(len(ranges), 12)
+
+    def test_changed_midway(self):
+        """下到一半文件变了，从头下新版本，不能新旧拼在一起"""
+        server = _StubRangeServer(bytes(range(256)) * 40)
+        server.change_after = 4
+        self.assertTrue(self._download(server))
+        self.assertEqual(self.save_path.read_bytes(), server.content)
+        self.assertEqual(server.etag, '"v2"')
+        self.assertEqual([request.headers.get("Range") for request in server.requests].count("bytes=0-0"), 2)  # 重新探测了一次
+        self.assertFalse(self.save_path.with_name(f"{self.save_path.name}.chunks").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import asyncio
+import unittest
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import httpx
+
+from src.paratranz import Paratranz
+
+BASE_URL = "http://paratranz.test/api"
+NOW = datetime(2024, 1, 1, 12, tzinfo=timezone.utc)
+
+
+def _isoformat(time: datetime | None) -> str | None:
+    return time.strftime("%Y-%m-%dT%H:%M:%S.000Z") if time else None
+
+
+class _StubParatranz:
+    """假的 paratranz api，触发导出后轮询 ready_after 次才出现新的导出"""
+    def __init__(self, artifact_time: datetime | None, last_change: datetime, ready_after: int | None = 1):
+        self.artifact_time = artifact_time
+        self.last_change = last_change
+        self.ready_after = ready_after
+        self.triggered = 0
+        self.polls = 0
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path.removeprefix("/api")
+        if request.method == "POST" and path.endswith("/artifacts"):
+            self.triggered += 1
+            return httpx.Response(200, headers={"Date": format_datetime(NOW, usegmt=True)}, json={})
+        if path.endswith("/artifacts"):
+            if self.triggered:
+                self.polls += 1
+                if self.ready_after is not None and self.polls > self.ready_after:
+                    self.artifact_time = NOW + timedelta(seconds=30)
+            if self.artifact_time is None:
+                return httpx.Response(404)
+            return httpx.Response(200, json={"createdAt": _isoformat(self.artifact_time)})
+        return httpx.Response(200, json={"activeAt": _isoformat(self.last_change)})
+
+
+class TestEnsureFreshExport(unittest.TestCase):
+    def _ensure(self, stub: _StubParatranz, **poll) -> bool:
+        paratranz = Paratranz(base_url=BASE_URL)
+        for key, value in ({"POLL_INITIAL_DELAY": 0.001, "POLL_MAX_DELAY": 0.002} | poll).items():
+            setattr(paratranz, key, value)
+
+        async def _run():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(stub.handler)) as client:
+                return await paratranz.ensure_fresh_export(client)
+        return asyncio.run(_run())
+
+    def test_skip_when_fresh(self):
+        """现有导出比最后一次改动新，不触发导出"""
+        stub = _StubParatranz(artifact_time=NOW, last_change=NOW - timedelta(hours=1))
+        self.assertTrue(self._ensure(stub))
+        self.assertEqual(stub.triggered, 0)
+
+    def test_trigger_and_poll(self):
+        """导出过期了就触发，轮询到比触发时间新的导出"""
+        stub = _StubParatranz(artifact_time=NOW - timedelta(hours=1), last_change=NOW, ready_after=3)
+        self.assertTrue(self._ensure(stub))
+        self.assertEqual(stub.triggered, 1)
+        self.assertEqual(stub.polls, 4)
+
+    def test_trigger_without_artifact(self):
+        """没导出过 (404) 也要触发"""
+        stub = _StubParatranz(artifact_time=None, last_change=NOW)
+        self.assertTrue(self._ensure(stub))
+        self.assertEqual(stub.triggered, 1)
+
+    def test_timeout(self):
+        """一直没有新的导出，超时返回 False"""
+        stub = _StubParatranz(artifact_time=NOW - timedelta(hours=1), last_change=NOW, ready_after=None)
+        self.assertFalse(self._ensure(stub, POLL_TIMEOUT=0.05))
+        self.assertEqual(stub.triggered, 1)
+        self.assertGreater(stub.polls, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import itertools
+import unittest
+from pathlib import Path
+
+from src.consts import DirNamesJS, DirNamesTwee
+from src.parse_text import JS_PARSERS, TWEE_PARSERS, ParseTextTwee
+
+
+def _chain_twee_directory(filedir: Path) -> str | None:
+	"""原先 ParseTextTwee.parse 里的 if/elif，按顺序第一个匹配上的目录"""
+	names = {filedir.name, filedir.parent.name}
+	if DirNamesTwee.NORMAL.value in filedir.name:
+		return DirNamesTwee.NORMAL.value
+	elif DirNamesTwee.FRAMEWORK.value in names:
+		return DirNamesTwee.FRAMEWORK.value
+	elif DirNamesTwee.CONFIG.value == filedir.name:
+		return DirNamesTwee.CONFIG.value
+	elif DirNamesTwee.VARIABLES.value == filedir.name:
+		return DirNamesTwee.VARIABLES.value
+	elif DirNamesTwee.BASE_CLOTHING.value == filedir.name:
+		return DirNamesTwee.BASE_CLOTHING.value
+	elif DirNamesTwee.BASE_COMBAT.value in names:
+		return DirNamesTwee.BASE_COMBAT.value
+	elif DirNamesTwee.BASE_DEBUG.value == filedir.name:
+		return DirNamesTwee.BASE_DEBUG.value
+	elif DirNamesTwee.BASE_SYSTEM.value in names:
+		return DirNamesTwee.BASE_SYSTEM.value
+	elif DirNamesTwee.FLAVOUR_TEXT_GENERATORS.value == filedir.name:
+		return DirNamesTwee.FLAVOUR_TEXT_GENERATORS.value
+	return None
+
+
+def _chain_js_directory(filedir: Path) -> str | None:
+	"""原先 ParseTextJS.parse 里的 if/elif，都是本级目录名完全一致"""
+	for dir_name in (
+		DirNamesJS.CONFIG,
+		DirNamesJS.SETUP,
+		DirNamesJS.HELPERS,
+		DirNamesJS.JAVASCRIPT,
+		DirNamesJS.VARIABLES,
+		DirNamesJS.SPECIAL_MASTURBATION,
+		DirNamesJS.PREGNANCY,
+		DirNamesJS.TEMPLATES,
+		DirNamesJS.EXTERNAL,
+		DirNamesJS.BASE_CLOTHING,
+		DirNamesJS.BASE_SYSTEM,
+		DirNamesJS.MAIN,
+		DirNamesJS.RENDERER,
+		DirNamesJS.LOC_FORESTSHOP,
+	):
+		if dir_name.value == filedir.name:
+			return dir_name.value
+	return None
+
+
+class TestParserRegistry(unittest.TestCase):
+	def test_twee_directory_order(self):
+		"""本级目录和上级目录两两组合，归到的目录和原先的 if/elif 一样"""
+		dir_names = [dir_name.value for dir_name in DirNamesTwee] + ["overworld-town", "loc-street", "other", "game"]
+		for parent, name in itertools.product(dir_names, repeat=2):
+			filedir = Path("game") / parent / name
+			with self.subTest(filedir=filedir.as_posix()):
+				self.assertEqual(TWEE_PARSERS.resolve_directory(filedir), _chain_twee_directory(filedir))
+
+	def test_js_directory_order(self):
+		dir_names = [dir_name.value for dir_name in DirNamesJS] + ["other", "game"]
+		for parent, name in itertools.product(dir_names, repeat=2):
+			filedir = Path("game") / parent / name
+			with self.subTest(filedir=filedir.as_posix()):
+				self.assertEqual(JS_PARSERS.resolve_directory(filedir), _chain_js_directory(filedir))
+
+	def test_framework_parent_wins(self):
+		"""00-framework-tools 下的子目录按 framework 抓，不按子目录自己的名字"""
+		for relpath, handler in (
+			("00-framework-tools/01-config/start.twee", "parse_normal"),
+			("00-framework-tools/04-Variables/variables-static.twee", "parse_normal"),
+			("00-framework-tools/some-dir/waiting-room.twee", "_parse_waiting_room"),
+			("01-config/start.twee", "_parse_start"),
+			("base-system/base-debug/characteristics.twee", "parse_normal"),
+			("base-system/some-dir/characteristics.twee", "_parse_characteristic"),
+		):
+			with self.subTest(relpath=relpath):
+				pt = ParseTextTwee([":: Passage\n"], Path("game") / relpath, [])
+				pt.parse()
+				self.assertEqual(pt.handler_name, handler)
+
+
+class TestOnlyWidgetsHalf(unittest.TestCase):
+	def test_half_widgets(self):
+		"""半拉的 <<print [ / <<= [ / <<- [ 整行只有部件，不抓"""
+		for line in ("<<print [", "<<= [", "<<- [", "<<print either(", "<<= either(", "<<- either("):
+			with self.subTest(line=line):
+				self.assertTrue(ParseTextTwee.is_only_widgets(line))
+
+	def test_print_list_dropped(self):
+		"""特殊文件里单独一行的 <<print [ 不再抓进字典，下面的文本照抓"""
+		lines = [":: Passage\n", "<<print [\n", '"Some text",\n', "]>>\n"]
+		for relpath in (
+			"base-system/characteristics.twee",
+			"base-combat/actions.twee",
+			"base-clothing/captiontext.twee",
+		):
+			with self.subTest(relpath=relpath):
+				able_lines = [bool(line) for line in ParseTextTwee(lines, Path("game") / relpath, []).parse()]
+				self.assertEqual(able_lines, [False, False, True, False])
+
+
+if __name__ == "__main__":
+	unittest.main()
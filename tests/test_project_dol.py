@@ -0,0 +1,32 @@
+import tempfile
+import unittest
+from pathlib import Path
+from zipfile import ZipFile
+
+from src.project_dol import ProjectDOL
+
+
+class TestExtractMembers(unittest.TestCase):
+	def test_parallel_extract_shared_dirs(self):
+		"""好多目录、每个目录好几个文件分给不同线程，同时建目录不能报 FileExistsError"""
+		with tempfile.TemporaryDirectory() as tmp:
+			tmp = Path(tmp)
+			zip_path = tmp / "dol.zip"
+			with ZipFile(zip_path, "w") as zfp:
+				for idx in range(400):
+					zfp.writestr(f"degrees-of-lewdity-master/game/d{idx}/", "")
+					for file in range(4):
+						zfp.writestr(f"degrees-of-lewdity-master/game/d{idx}/sub/f{file}.twee", f":: P{idx}-{file}\n")
+			with ZipFile(zip_path) as zfp:
+				names = zfp.namelist()
+
+			for run in range(5):
+				target = tmp / f"out{run}"
+				ProjectDOL._extract_members(zip_path, names, target, workers=8)
+				files = [path for path in target.rglob("*") if path.is_file()]
+				self.assertEqual(len(files), 1600)
+				self.assertEqual((target / "degrees-of-lewdity-master/game/d7/sub/f3.twee").read_text(), ":: P7-3\n")
+
+
+if __name__ == "__main__":
+	unittest.main()